@@ -16,9 +16,13 @@ Prize targets:
 import os
 import json
 import time
-from typing import Dict, Any, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 from anthropic import Anthropic
 
+from http_pool import get_anthropic_http_client
+
 
 # ---------------------------------------------------------------------------
 # Tool definitions that Claude can call
@@ -264,7 +268,10 @@ class MarketplaceAgent:
     ):
         self.api_key = anthropic_api_key or os.getenv("ANTHROPIC_API_KEY", "")
         self.model = model or os.getenv("CLAUDE_MODEL", "claude-sonnet-4-20250514")
-        self.client = Anthropic(api_key=self.api_key) if self.api_key else None
+        self.client = (
+            Anthropic(api_key=self.api_key, http_client=get_anthropic_http_client())
+            if self.api_key else None
+        )
         self.elastic = elastic_client
         self.sanitizer = sanitizer
 
@@ -540,12 +547,26 @@ class MarketplaceAgent:
         Claude reasons, calls tools, and returns a final response.
         Returns dict with 'response', 'tool_calls', 'session_stats'.
         """
+        result: Dict[str, Any] = {}
+        for event in self.chat_stream(user_message):
+            if event["type"] == "done":
+                result = event["result"]
+        return result
+
+    def chat_stream(self, user_message: str) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of chat(). Yields events as Claude produces them:
+          {"type": "text", "text": ...}          text delta
+          {"type": "tool_call", "tool": ..., ...} after each tool runs
+          {"type": "done", "result": {...}}      same dict chat() returns
+        """
         if not self.client:
-            return {
+            yield {"type": "done", "result": {
                 "response": "Anthropic API key not configured. Set ANTHROPIC_API_KEY.",
                 "tool_calls": [],
                 "session_stats": self.session_stats,
-            }
+            }}
+            return
 
         # Add user message to history
         self.conversation_history.append({
@@ -557,14 +578,17 @@ class MarketplaceAgent:
         max_iterations = 10  # safety limit for tool loops
 
         for iteration in range(max_iterations):
-            # Call Claude
-            response = self.client.messages.create(
+            # Call Claude, forwarding text as it arrives
+            with self.client.messages.stream(
                 model=self.model,
                 max_tokens=4096,
                 system=SYSTEM_PROMPT,
                 tools=AGENT_TOOLS,
                 messages=self.conversation_history,
-            )
+            ) as stream:
+                for text in stream.text_stream:
+                    yield {"type": "text", "text": text}
+                response = stream.get_final_message()
 
             # Check if Claude wants to use tools
             if response.stop_reason == "tool_use":
@@ -593,11 +617,13 @@ class MarketplaceAgent:
                 tool_results = []
                 for tool_use in tool_uses:
                     result = self._execute_tool(tool_use.name, tool_use.input)
-                    tool_calls_log.append({
+                    call = {
                         "tool": tool_use.name,
                         "input": tool_use.input,
                         "output_preview": result[:300],
-                    })
+                    }
+                    tool_calls_log.append(call)
+                    yield {"type": "tool_call", **call}
                     tool_results.append({
                         "type": "tool_result",
                         "tool_use_id": tool_use.id,
@@ -621,22 +647,23 @@ class MarketplaceAgent:
                     "content": final_text,
                 })
 
-                return {
+                yield {"type": "done", "result": {
                     "response": final_text,
                     "tool_calls": tool_calls_log,
                     "session_stats": self.session_stats,
                     "token_balance": self.token_balance,
                     "iterations": iteration + 1,
-                }
+                }}
+                return
 
         # Safety: too many iterations
-        return {
+        yield {"type": "done", "result": {
             "response": "Agent reached maximum reasoning iterations. Partial results may be available.",
             "tool_calls": tool_calls_log,
             "session_stats": self.session_stats,
             "token_balance": self.token_balance,
             "iterations": max_iterations,
-        }
+        }}
 
     def reset_session(self):
         """Reset conversation and session state."""
@@ -658,3 +685,100 @@ class MarketplaceAgent:
             "conversation_turns": len([m for m in self.conversation_history if m["role"] == "user"]),
             "stats": self.session_stats,
         }
+
+    def export_state(self) -> Dict[str, Any]:
+        """Snapshot the session state as plain (picklable) data."""
+        return {
+            "conversation_history": self.conversation_history,
+            "purchased_workflows": self.purchased_workflows,
+            "token_balance": self.token_balance,
+            "session_stats": self.session_stats,
+        }
+
+    def load_state(self, state: Dict[str, Any]):
+        """Restore session state produced by export_state()."""
+        self.conversation_history = state["conversation_history"]
+        self.purchased_workflows = state["purchased_workflows"]
+        self.token_balance = state["token_balance"]
+        self.session_stats = state["session_stats"]
+
+
+class AgentSessionStore:
+    """
+    One MarketplaceAgent per client session, so concurrent conversations
+    don't share history, balance or stats. Sessions idle for longer than
+    ttl seconds expire, and at most maxsize are kept (least recently used
+    evicted first). Each session also carries a lock that callers hold for
+    a whole chat turn, so concurrent turns of one session don't overwrite
+    each other's state.
+    """
+
+    def __init__(self, factory: Callable[[], MarketplaceAgent], maxsize: int = 10_000, ttl: float = 3600):
+        self.factory = factory
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (last_used, agent, turn lock)
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> MarketplaceAgent:
+        """Return the session's agent, starting a fresh one if needed."""
+        return self.session(session_id)[0]
+
+    def session(self, session_id: str) -> Tuple[MarketplaceAgent, threading.Lock]:
+        """Return the session's agent and its turn lock, starting a fresh session if needed."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and now - entry[0] <= self.ttl:
+                _, agent, turn_lock = entry
+            else:
+                agent, turn_lock = self.factory(), threading.Lock()
+            self._sessions[session_id] = (now, agent, turn_lock)
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+            return agent, turn_lock
+
+    def _evict(self, now: float):
+        while len(self._sessions) > self.maxsize:
+            self._sessions.popitem(last=False)
+        # Oldest first, so stop at the first session still within its ttl
+        while self._sessions:
+            last_used = next(iter(self._sessions.values()))[0]
+            if now - last_used <= self.ttl:
+                break
+            self._sessions.popitem(last=False)
+
+
+# ---------------------------------------------------------------------------
+# Process-pool workers
+# ---------------------------------------------------------------------------
+# Each worker process owns one MarketplaceAgent (built once by the pool
+# initializer). Session state travels with every job, so any worker can
+# serve any session and the API process stays the source of truth.
+
+_worker_agent: Optional[MarketplaceAgent] = None
+
+
+def init_worker_agent():
+    """ProcessPoolExecutor initializer: build this worker's agent from env."""
+    global _worker_agent
+    from sanitizer import PrivacySanitizer
+
+    elastic_client = None
+    cloud_id = os.getenv("ELASTIC_CLOUD_ID", "")
+    api_key = os.getenv("ELASTIC_API_KEY", "")
+    jina_key = os.getenv("JINA_API_KEY", "")
+    if cloud_id and api_key and jina_key:
+        from elastic_client import ElasticClient, JinaEmbedder
+        elastic_client = ElasticClient(
+            cloud_id=cloud_id, api_key=api_key, jina_embedder=JinaEmbedder(api_key=jina_key)
+        )
+
+    _worker_agent = MarketplaceAgent(elastic_client=elastic_client, sanitizer=PrivacySanitizer())
+
+
+def run_chat_job(state: Dict[str, Any], user_message: str):
+    """Run one chat turn on this worker's agent. Returns (result, new_state)."""
+    _worker_agent.load_state(state)
+    result = _worker_agent.chat(user_message)
+    return result, _worker_agent.export_state()
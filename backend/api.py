@@ -6,6 +6,7 @@ Endpoints:
   GET  /health                   Health check
   GET  /api/workflows            List all workflows
   POST /api/search               Hybrid search (Elastic kNN + BM25)
+  GET  /api/recommend/<id>       Workflows similar to a given workflow
   POST /api/purchase             Purchase a workflow
   POST /api/feedback             Rate a workflow
 
@@ -14,6 +15,7 @@ Endpoints:
 
   ── Claude Agent ──
   POST /api/agent/chat           Multi-turn agent conversation
+  POST /api/agent/chat/stream    Same, streamed as Server-Sent Events
   GET  /api/agent/session        Get session state
   POST /api/agent/reset          Reset agent session
 
@@ -41,13 +43,35 @@ Tech stack: Flask, Elasticsearch, JINA embeddings, Claude Agent SDK
 """
 
 import os
+
+# GEVENT=1 runs `python api.py` on gevent too; patch before anything opens sockets
+# (wsgi.py does the same for gunicorn's gevent workers)
+USE_GEVENT = os.getenv("GEVENT", "").lower() in ("1", "true")
+if USE_GEVENT:
+    from gevent import monkey
+
+    monkey.patch_all()
+
 import sys
-import json
+import queue
+import hashlib
+import threading
+import time
+import atexit
+import logging
+import logging.handlers
 from datetime import datetime
-
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import msgspec
+import numpy as np
+import orjson
+from flask import Flask, Response, request, jsonify, abort, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from dotenv import load_dotenv
+from werkzeug.exceptions import HTTPException
 
 # Load .env
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
@@ -55,118 +79,422 @@ load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+logger = logging.getLogger("api")
+
 from sanitizer import PrivacySanitizer
-from commerce import CommerceEngine
+from commerce import CommerceEngine, TX_ENCODER
+from pricing import PricingEngine
+from response_cache import ResponseCache
+
+# Cache for read-only GET responses (Redis when REDIS_URL is set)
+response_cache = ResponseCache(redis_url=os.getenv("REDIS_URL"))
+COMMERCE_CACHE_TTL = 10  # seconds
+PRICING_CACHE_TTL = 60  # seconds (Elastic mode only, see _pricing_cache)
+SEARCH_CACHE_TTL = 30  # seconds
+
+
+def _user_id_arg(**_):
+    return request.args.get("user_id", "default_user")
+
+
+def _query_digest(query):
+    """Stable key for a JSON query body (key order does not matter)."""
+    return hashlib.blake2b(orjson.dumps(query, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+def _invalidate_user_commerce(user_id):
+    """Drop cached commerce views after a balance / transaction change."""
+    response_cache.invalidate("get_balance", user_id)
+    response_cache.invalidate("get_transactions")
+    response_cache.invalidate("marketplace_stats")
+
+
+# Spawned agent-pool workers (AGENT_WORKERS) re-import this script as
+# __mp_main__ when it runs as `python api.py`. They only need agent.py, so
+# the startup below (threads, connections, data loading) is skipped there;
+# see also the STARTUP section at the end of the module.
+_POOL_WORKER = __name__ == "__mp_main__"
+visa_enabled = False
+
+if not _POOL_WORKER:
+    # -----------------------------------------------------------------------
+    # Logging — handlers enqueue records, a background listener does the stdio
+    # writes so request threads never block on the stdout lock.
+    # -----------------------------------------------------------------------
+    _log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    _log_stream = logging.StreamHandler()
+    _log_stream.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
+    _log_listener = logging.handlers.QueueListener(_log_queue, _log_stream)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    logging.getLogger().addHandler(logging.handlers.QueueHandler(_log_queue))
+    logging.getLogger().setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    # Try to import Visa payments (optional, requires Visa credentials)
+    try:
+        from visa_payments import visa_bp
+        visa_enabled = True
+        logger.info("Visa payment integration loaded")
+    except Exception as e:
+        visa_enabled = False
+        logger.info("Visa payments disabled (%s)", e)
 
-# Try to import Visa payments (optional, requires Visa credentials)
-try:
-    from visa_payments import visa_bp
-    visa_enabled = True
-    print("[api] Visa payment integration loaded")
-except Exception as e:
-    visa_enabled = False
-    print(f"[api] Visa payments disabled ({e})")
+    # -----------------------------------------------------------------------
+    # Try to initialize Elasticsearch + JINA (graceful fallback if keys missing)
+    # -----------------------------------------------------------------------
+    elastic_client = None
+    try:
+        cloud_id = os.getenv("ELASTIC_CLOUD_ID", "")
+        api_key = os.getenv("ELASTIC_API_KEY", "")
+        jina_key = os.getenv("JINA_API_KEY", "")
 
-# ---------------------------------------------------------------------------
-# Try to initialize Elasticsearch + JINA (graceful fallback if keys missing)
-# ---------------------------------------------------------------------------
-elastic_client = None
-try:
-    cloud_id = os.getenv("ELASTIC_CLOUD_ID", "")
-    api_key = os.getenv("ELASTIC_API_KEY", "")
-    jina_key = os.getenv("JINA_API_KEY", "")
-
-    if cloud_id and api_key and jina_key:
-        from elastic_client import ElasticClient, JinaEmbedder
-
-        embedder = JinaEmbedder(api_key=jina_key)
-        elastic_client = ElasticClient(
-            cloud_id=cloud_id, api_key=api_key, jina_embedder=embedder
-        )
-        print("[api] Elasticsearch + JINA connected")
-    else:
-        print("[api] Elastic/JINA keys not set — running in-memory fallback mode")
-except Exception as e:
-    print(f"[api] Elasticsearch init failed ({e}) — using in-memory fallback")
+        if cloud_id and api_key and jina_key:
+            from elastic_client import ElasticClient, JinaEmbedder
 
-# ---------------------------------------------------------------------------
-# Initialize services
-# ---------------------------------------------------------------------------
-from matcher import WorkflowMatcher
+            embedder = JinaEmbedder(api_key=jina_key)
+            elastic_client = ElasticClient(
+                cloud_id=cloud_id, api_key=api_key, jina_embedder=embedder
+            )
+            logger.info("Elasticsearch + JINA connected")
+            elastic_client.warmup()
+        else:
+            logger.info("Elastic/JINA keys not set — running in-memory fallback mode")
+    except Exception as e:
+        logger.warning("Elasticsearch init failed (%s) — using in-memory fallback", e)
+
+    # -----------------------------------------------------------------------
+    # Initialize services
+    # -----------------------------------------------------------------------
+    from matcher import WorkflowMatcher
+
+    # Without Elastic, a JINA key alone still upgrades in-memory ranking to embeddings
+    fallback_embedder = None
+    if elastic_client is None and os.getenv("JINA_API_KEY"):
+        try:
+            from elastic_client import JinaEmbedder
+
+            fallback_embedder = JinaEmbedder(api_key=os.getenv("JINA_API_KEY"))
+        except Exception as e:
+            logger.info("JINA embeddings unavailable for in-memory search (%s)", e)
+
+    matcher = WorkflowMatcher(elastic_client=elastic_client, embedder=fallback_embedder)
+    sanitizer = PrivacySanitizer()
+
+    # Coalesce concurrent searches into one JINA (+ one _msearch) round trip.
+    # Token-only in-memory mode has no round trips to save, so it searches directly.
+    search_batcher = None
+    if elastic_client is not None or fallback_embedder is not None:
+        from search_batcher import BatchingSearchService
+
+        search_batcher = BatchingSearchService(matcher)
+        atexit.register(search_batcher.close)
+    commerce = CommerceEngine(journal_path=os.getenv("COMMERCE_DB"))
+    atexit.register(commerce.close)
+
+    # Rating writes from /api/feedback go to Elastic in periodic _bulk batches;
+    # searches cached before a batch lands are dropped again once it has
+    update_batcher = None
+    if elastic_client is not None:
+        from update_batcher import BatchingUpdateService
+
+        def _on_ratings_flushed():
+            # Anything rebuilt from the index while the batch was pending is stale
+            response_cache.invalidate("search_workflows")
+            _invalidate_workflows_cache()
+            _pricing_cache.clear()
+
+        update_batcher = BatchingUpdateService(elastic_client, on_flush=_on_ratings_flushed)
+        atexit.register(update_batcher.close)
+
+    # Load workflows from disk (always, for fallback + listing)
+    WORKFLOWS_PATH = os.path.join(os.path.dirname(__file__), "workflows.json")
+    matcher.load_workflows(WORKFLOWS_PATH)
+
+    # -----------------------------------------------------------------------
+    # Initialize Claude Agent
+    # -----------------------------------------------------------------------
+    # Each client gets its own agent session, picked by the X-Session-Id header
+    # (or "sid" cookie); clients that send neither share the "default" session.
+    agent_sessions = None
+    agent_pool = None
+    AGENT_CHAT_TIMEOUT = 120  # seconds
+    AGENT_SESSION_HEADER = "X-Session-Id"
+    AGENT_SESSION_TTL = 3600  # seconds idle before a session is dropped
+    try:
+        anthropic_key = os.getenv("ANTHROPIC_API_KEY", "")
+        if anthropic_key:
+            from agent import AgentSessionStore, MarketplaceAgent
+
+            # Read once here rather than by every new session's agent
+            claude_model = os.getenv("CLAUDE_MODEL", "claude-sonnet-4-20250514")
+            agent_sessions = AgentSessionStore(
+                lambda: MarketplaceAgent(
+                    elastic_client=elastic_client,
+                    sanitizer=sanitizer,
+                    anthropic_api_key=anthropic_key,
+                    model=claude_model,
+                ),
+                ttl=AGENT_SESSION_TTL,
+            )
+            logger.info("Claude Agent initialized")
+
+            # Optionally run chat turns in worker processes (AGENT_WORKERS > 0)
+            agent_workers = int(os.getenv("AGENT_WORKERS", "0"))
+            if agent_workers > 0:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                from agent import init_worker_agent, run_chat_job
+
+                # spawn, not fork: the logging listener and batcher threads are
+                # already running and a forked child could inherit their held locks
+                agent_pool = ProcessPoolExecutor(
+                    max_workers=agent_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_worker_agent,
+                )
+                logger.info("Agent process pool started (%d workers)", agent_workers)
+        else:
+            logger.info("ANTHROPIC_API_KEY not set — agent endpoints disabled")
+    except Exception as e:
+        logger.warning("Agent init failed (%s) — agent endpoints disabled", e)
 
-matcher = WorkflowMatcher(elastic_client=elastic_client)
-sanitizer = PrivacySanitizer()
-commerce = CommerceEngine()
+    # -----------------------------------------------------------------------
+    # Initialize Price-Model Orchestrator (optional — from price-model branch)
+    # -----------------------------------------------------------------------
+    orchestrator = None
+    try:
+        from config import initialize_services
+        from orchestrator import MarketplaceOrchestrator
+
+        initialize_services()
+        orchestrator = MarketplaceOrchestrator()
+
+        try:
+            # Rebuilds an index still on the old vector mapping; the load below
+            # re-embeds and re-indexes everything.
+            orchestrator.decomposer.es_service.create_index(delete_existing=False)
+        except Exception:
+            pass
+        try:
+            orchestrator.decomposer.load_and_index_workflows("workflows.json")
+            orchestrator.decomposer.es_service.warmup()
+        except Exception:
+            pass
+
+        logger.info("Price-model orchestrator initialized")
+    except Exception as e:
+        logger.info("Orchestrator init skipped (%s) — estimate/buy endpoints disabled", e)
 
-# Load workflows from disk (always, for fallback + listing)
-WORKFLOWS_PATH = os.path.join(os.path.dirname(__file__), "workflows.json")
-matcher.load_workflows(WORKFLOWS_PATH)
 
 # ---------------------------------------------------------------------------
-# Initialize Claude Agent
+# Flask app
 # ---------------------------------------------------------------------------
-agent_instance = None
-try:
-    anthropic_key = os.getenv("ANTHROPIC_API_KEY", "")
-    if anthropic_key:
-        from agent import MarketplaceAgent
-
-        agent_instance = MarketplaceAgent(
-            elastic_client=elastic_client,
-            sanitizer=sanitizer,
-            anthropic_api_key=anthropic_key,
-        )
-        print("[api] Claude Agent initialized")
-    else:
-        print("[api] ANTHROPIC_API_KEY not set — agent endpoints disabled")
-except Exception as e:
-    print(f"[api] Agent init failed ({e}) — agent endpoints disabled")
+ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
 
-# ---------------------------------------------------------------------------
-# Initialize Price-Model Orchestrator (optional — from price-model branch)
-# ---------------------------------------------------------------------------
-orchestrator = None
-try:
-    from config import initialize_services
-    from orchestrator import MarketplaceOrchestrator
 
-    initialize_services()
-    orchestrator = MarketplaceOrchestrator()
+def _json_default(obj):
+    """Types orjson doesn't encode natively."""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
-    try:
-        orchestrator.decomposer.es_service.create_index(delete_existing=False)
-    except Exception:
-        pass
-    try:
-        orchestrator.decomposer.load_and_index_workflows("workflows.json")
-    except Exception:
-        pass
 
-    print("[api] Price-model orchestrator initialized")
-except Exception as e:
-    print(f"[api] Orchestrator init skipped ({e}) — estimate/buy endpoints disabled")
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify()/request.get_json() backed by orjson instead of stdlib json."""
 
-# ---------------------------------------------------------------------------
-# Flask app
-# ---------------------------------------------------------------------------
-app = Flask(__name__)
-CORS(app)
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_json_default, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_json_default, option=ORJSON_OPTIONS),
+            mimetype=self.mimetype,
+        )
+
+
+# JSON-only API: no static file route
+app = Flask(__name__, static_folder=None, static_url_path=None)
+app.json = OrjsonProvider(app)
+app.url_map.strict_slashes = False
+
+# CORS for /api/* and /health. Header values are fixed at startup, so each
+# response only needs an origin check and a dict update.
+ALLOWED_ORIGINS = frozenset(os.getenv("ALLOWED_ORIGINS", "*").split(","))
+_ANY_ORIGIN = "*" in ALLOWED_ORIGINS
+_CORS_PREFLIGHT_HEADERS = {
+    "Access-Control-Allow-Methods": "DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT",
+    "Access-Control-Max-Age": "86400",  # let browsers cache preflight responses for a day
+}
+
+
+def _is_cors_path(path):
+    return path.startswith("/api/") or path == "/health"
+
+
+@app.before_request
+def _cors_preflight():
+    """Answer CORS preflights directly instead of routing them."""
+    if (
+        request.method == "OPTIONS"
+        and "Access-Control-Request-Method" in request.headers
+        and _is_cors_path(request.path)
+    ):
+        response = app.response_class(status=204)
+        response.headers.update(_CORS_PREFLIGHT_HEADERS)
+        requested = request.headers.get("Access-Control-Request-Headers")
+        if requested:
+            response.headers["Access-Control-Allow-Headers"] = requested
+        return response
+
+
+@app.after_request
+def _cors_headers(response):
+    if not _is_cors_path(request.path):
+        return response
+    origin = request.headers.get("Origin")
+    if origin:
+        if _ANY_ORIGIN or origin in ALLOWED_ORIGINS:
+            response.headers["Access-Control-Allow-Origin"] = origin
+            response.vary.add("Origin")
+    elif _ANY_ORIGIN:
+        response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
 
 # Register Visa payments blueprint if enabled
 if visa_enabled:
     app.register_blueprint(visa_bp)
 
 
+# ===== REQUEST HELPERS =====
+
+MAX_BODY_BYTES = 1_000_000
+
+
+def _raw_body() -> bytes:
+    """Request body bytes; aborts 413 / 415 on oversized or non-JSON payloads."""
+    if request.content_length and request.content_length > MAX_BODY_BYTES:
+        abort(413)
+    raw = request.get_data(cache=False)
+    if raw and not request.is_json:
+        abort(415)
+    return raw
+
+
+def _body():
+    """
+    Parse the JSON request body once with orjson.
+    Returns {} for an empty body; aborts 413 / 415 / 400 on oversized,
+    non-JSON, or malformed payloads.
+    """
+    raw = _raw_body()
+    if not raw:
+        return {}
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        abort(400, description="Malformed JSON body")
+
+
+# Typed bodies for the fixed-shape POST routes, decoded straight from the
+# request bytes by a msgspec decoder built once per schema.
+
+class WorkflowRequest(msgspec.Struct):
+    workflow_id: str = ""
+    user_id: str = "default_user"
+
+
+class UserRequest(msgspec.Struct):
+    user_id: str = "default_user"
+
+
+class DepositRequest(msgspec.Struct):
+    user_id: str = "default_user"
+    amount: int = 0
+
+
+_workflow_request = msgspec.json.Decoder(WorkflowRequest)
+_user_request = msgspec.json.Decoder(UserRequest)
+_deposit_request = msgspec.json.Decoder(DepositRequest)
+
+
+def _decode(decoder: msgspec.json.Decoder):
+    """
+    Like _body(), but decodes into the decoder's request Struct (an empty
+    body gives the defaults); aborts 400 on malformed JSON or wrong types.
+    """
+    try:
+        return decoder.decode(_raw_body() or b"{}")
+    except msgspec.ValidationError as e:
+        abort(400, description=str(e))
+    except msgspec.DecodeError:
+        abort(400, description="Malformed JSON body")
+
+
+@app.errorhandler(HTTPException)
+def _http_error(e):
+    """abort() and routing errors as JSON, like every other error response."""
+    return jsonify({"error": e.description}), e.code
+
+
+def _body_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+@app.after_request
+def _conditional_get(response):
+    """
+    Strong ETag on successful GET JSON responses; answers a matching
+    If-None-Match with 304 and no body. Views that cache their body may
+    set the ETag themselves to skip re-hashing it here.
+    """
+    if (
+        request.method == "GET"
+        and response.status_code == 200
+        and response.mimetype == "application/json"
+        and not response.is_streamed
+    ):
+        if "ETag" not in response.headers:
+            response.set_etag(_body_etag(response.get_data()))
+        response.make_conditional(request)
+    return response
+
+
+# ===== CLOCK =====
+
+CLOCK_REFRESH_SECONDS = 0.2
+_cached_now = datetime.now().isoformat(timespec="seconds")
+
+
+def _refresh_clock():
+    """Keep a second-resolution ISO timestamp for endpoints that only need ~now."""
+    global _cached_now
+    while True:
+        _cached_now = datetime.now().isoformat(timespec="seconds")
+        time.sleep(CLOCK_REFRESH_SECONDS)
+
+
+def _now_iso():
+    """Exact local ISO timestamp for records (one time.time() call, no datetime)."""
+    now = time.time()
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)) + f".{int(now % 1 * 1_000_000):06d}"
+
+
 # ===== HEALTH =====
 
 @app.route("/health", methods=["GET"])
 def health_check():
     return jsonify({
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _cached_now,
         "workflows_loaded": len(matcher.workflows),
         "elasticsearch": elastic_client is not None,
-        "agent_enabled": agent_instance is not None,
+        "agent_enabled": agent_sessions is not None,
         "orchestrator_enabled": orchestrator is not None,
         "visa_payments_enabled": visa_enabled,
     })
@@ -174,87 +502,115 @@ def health_check():
 
 # ===== CORE MARKETPLACE =====
 
-@app.route("/api/workflows", methods=["GET"])
-def list_workflows():
-    from pricing import PricingEngine
-    workflows = matcher.get_all_workflows()
+# Estimate avg_tokens_without as ~3.2× execution_tokens (observed ratio)
+TOKENS_WITHOUT_RATIO = 3.2
 
-    # Add dynamic pricing calculation for ALL workflows
-    for workflow in workflows:
-        rating = workflow.get('rating', 4.0)
 
-        # Derive avg_tokens_without / avg_tokens_with if missing
-        # Use execution_tokens as avg_tokens_with (tokens used WITH the workflow)
-        # Estimate avg_tokens_without as ~3.2× execution_tokens (observed ratio)
+def _apply_dynamic_pricing(workflows):
+    """Attach token-savings and dynamic pricing fields to each workflow in place."""
+    without_ratio = TOKENS_WITHOUT_RATIO
+
+    # Derive avg_tokens_without / avg_tokens_with if missing
+    # Use execution_tokens as avg_tokens_with (tokens used WITH the workflow)
+    for workflow in workflows:
         if 'avg_tokens_with' not in workflow:
             execution_tokens = workflow.get('execution_tokens', 0)
-            if execution_tokens > 0:
-                workflow['avg_tokens_with'] = execution_tokens
-            else:
-                workflow['avg_tokens_with'] = 0
-
+            workflow['avg_tokens_with'] = execution_tokens if execution_tokens > 0 else 0
         if 'avg_tokens_without' not in workflow:
-            avg_with = workflow.get('avg_tokens_with', 0)
-            if avg_with > 0:
-                workflow['avg_tokens_without'] = int(avg_with * 3.2)
-            else:
-                workflow['avg_tokens_without'] = 0
-
-        avg_without = workflow.get('avg_tokens_without', 0)
-        avg_with = workflow.get('avg_tokens_with', 0)
-
-        # Calculate tokens saved
-        tokens_saved = max(0, avg_without - avg_with)
-        workflow['tokens_saved'] = tokens_saved
-
-        # Calculate savings percentage
-        if avg_without > 0:
-            workflow['savings_percentage'] = int((tokens_saved / avg_without) * 100)
-        else:
-            workflow['savings_percentage'] = 0
-
-        # Calculate pricing via PricingEngine
-        if tokens_saved > 0:
-            pricing_result = PricingEngine.calculate_workflow_price(
-                avg_without,
-                avg_with,
-                rating,
-                None  # No comparable prices for now
-            )
+            avg_with = workflow['avg_tokens_with']
+            workflow['avg_tokens_without'] = int(avg_with * without_ratio) if avg_with > 0 else 0
+
+    if not workflows:
+        return workflows
+
+    # Savings and pricing math for every workflow in one vectorized pass
+    avg_without = np.fromiter((w['avg_tokens_without'] for w in workflows), dtype=np.int64, count=len(workflows))
+    avg_with = np.fromiter((w['avg_tokens_with'] for w in workflows), dtype=np.int64, count=len(workflows))
+    ratings = [w.get('rating', 4.0) for w in workflows]
+
+    tokens_saved = np.maximum(0, avg_without - avg_with)
+    savings_pct = np.zeros(len(workflows), dtype=np.int64)
+    has_baseline = avg_without > 0
+    savings_pct[has_baseline] = ((tokens_saved[has_baseline] / avg_without[has_baseline]) * 100).astype(np.int64)
+
+    prices = PricingEngine.calculate_workflow_prices(avg_without, avg_with, ratings)
+
+    rows = zip(
+        workflows, ratings, tokens_saved.tolist(), savings_pct.tolist(),
+        prices['base_amount'].tolist(), prices['base_price'].tolist(),
+        prices['quality_multiplier'].tolist(), prices['final_price'].tolist(),
+    )
+    for workflow, rating, saved, pct, base_amount, base_price, quality, final_price in rows:
+        workflow['tokens_saved'] = saved
+        workflow['savings_percentage'] = pct
+        token_cost = workflow.get('token_cost', 0)
+
+        if saved > 0:
             # Use token_cost as price if it exists and no price_tokens set,
             # otherwise use the calculated price
             if 'price_tokens' not in workflow:
-                token_cost = workflow.get('token_cost', 0)
-                if token_cost > 0:
-                    workflow['price_tokens'] = token_cost
-                else:
-                    workflow['price_tokens'] = pricing_result['final_price']
+                workflow['price_tokens'] = token_cost if token_cost > 0 else final_price
 
             # Recalculate ROI with actual price
             actual_price = workflow['price_tokens']
-            actual_roi = round((tokens_saved / actual_price * 100), 1) if actual_price > 0 else 0
-
             workflow['pricing'] = {
-                'base_price': pricing_result['base_price'],
-                'quality_multiplier': round(pricing_result['quality_multiplier'], 3),
-                'market_rate': pricing_result['market_rate'],
-                'roi_percentage': actual_roi,
-                'breakdown': pricing_result['breakdown']
+                'base_price': base_price,
+                'quality_multiplier': round(quality, 3),
+                'market_rate': None,  # No comparable prices for now
+                'roi_percentage': round((saved / actual_price * 100), 1) if actual_price > 0 else 0,
+                'breakdown': (
+                    f"Base: {base_amount} (15% of {saved:,} saved) → "
+                    f"Quality adjusted ({rating}★): ×{quality:.2f} → "
+                    f"Final: {final_price} tokens"
+                ),
             }
         else:
             # Fallback for workflows with no savings data
-            token_cost = workflow.get('token_cost', 0)
             if 'price_tokens' not in workflow:
                 workflow['price_tokens'] = token_cost
-            workflow.setdefault('pricing', {
-                'base_price': token_cost,
-                'quality_multiplier': 1.0,
-                'market_rate': None,
-                'roi_percentage': 0,
-                'breakdown': 'Flat-rate pricing'
-            })
+            if 'pricing' not in workflow:
+                workflow['pricing'] = {
+                    'base_price': token_cost,
+                    'quality_multiplier': 1.0,
+                    'market_rate': None,
+                    'roi_percentage': 0,
+                    'breakdown': 'Flat-rate pricing',
+                }
 
-    return jsonify({"workflows": workflows, "count": len(workflows)})
+    return workflows
+
+
+# Serialized /api/workflows (body, etag). Rebuilt lazily; cleared when a rating changes.
+# In Elastic mode the agent can bump usage_count in the index behind our back,
+# so the blob also expires after WORKFLOWS_CACHE_TTL there.
+WORKFLOWS_CACHE_TTL = 60  # seconds
+_workflows_json_cache = None
+_workflows_json_built_at = 0.0
+
+
+def _invalidate_workflows_cache():
+    global _workflows_json_cache
+    _workflows_json_cache = None
+
+
+@app.route("/api/workflows", methods=["GET"])
+def list_workflows():
+    global _workflows_json_cache, _workflows_json_built_at
+    cached = _workflows_json_cache
+    if cached is None or (
+        elastic_client is not None and time.monotonic() - _workflows_json_built_at > WORKFLOWS_CACHE_TTL
+    ):
+        workflows = _apply_dynamic_pricing(matcher.get_all_workflows())
+        body = orjson.dumps(
+            {"workflows": workflows, "count": len(workflows)},
+            option=ORJSON_OPTIONS,
+        )
+        cached = _workflows_json_cache = (body, _body_etag(body))
+        _workflows_json_built_at = time.monotonic()
+    body, etag = cached
+    response = app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response
 
 
 @app.route("/api/search", methods=["POST"])
@@ -265,13 +621,44 @@ def search_workflows():
 
     Body: { "task_type": "...", "state": "...", ... }
     """
+    query = _body()
     try:
-        query = request.json
         if not query:
             return jsonify({"error": "Request body required"}), 400
 
-        results = matcher.search(query, top_k=10)
-        return jsonify({"results": results, "count": len(results), "query": query})
+        cache_key = response_cache.key("search_workflows", _query_digest(query))
+        body = response_cache.get(cache_key)
+        if body is not None:
+            return app.response_class(body, mimetype="application/json")
+
+        if search_batcher is not None:
+            results = search_batcher.search(query, top_k=10)
+        else:
+            results = matcher.search(query, top_k=10)
+        response = jsonify({"results": results, "count": len(results), "query": query})
+        response_cache.set(cache_key, response.get_data(), SEARCH_CACHE_TTL)
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+MAX_RECOMMEND_TOP_K = 100
+
+
+@app.route("/api/recommend/<workflow_id>", methods=["GET"])
+def recommend_workflows(workflow_id):
+    """
+    "More like this" for a workflow. In Elastic mode the stored embedding
+    is looked up server-side, so no JINA call is made.
+
+    Query: ?top_k=10  (clamped to 1..MAX_RECOMMEND_TOP_K)
+    """
+    try:
+        top_k = min(max(request.args.get("top_k", 10, type=int), 1), MAX_RECOMMEND_TOP_K)
+        results = matcher.recommend(workflow_id, top_k=top_k)
+        if results is None:
+            return jsonify({"error": "Workflow not found"}), 404
+        return jsonify({"workflow_id": workflow_id, "results": results, "count": len(results)})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -279,10 +666,10 @@ def search_workflows():
 @app.route("/api/purchase", methods=["POST"])
 def purchase_workflow():
     """Purchase a workflow. Deducts tokens, returns full execution template."""
+    req = _decode(_workflow_request)
     try:
-        data = request.json or {}
-        workflow_id = data.get("workflow_id")
-        user_id = data.get("user_id", "default_user")
+        workflow_id = req.workflow_id
+        user_id = req.user_id
 
         if not workflow_id:
             return jsonify({"error": "Missing workflow_id"}), 400
@@ -295,46 +682,61 @@ def purchase_workflow():
         receipt = commerce.purchase_workflow(user_id, workflow)
         if not receipt["success"]:
             return jsonify(receipt), 402  # Payment Required
+        _invalidate_user_commerce(user_id)
 
         return jsonify({
             "workflow": workflow,
             "receipt": receipt,
-            "purchased_at": datetime.now().isoformat(),
+            "purchased_at": _now_iso(),
             "success": True,
         })
     except Exception as e:
+        logger.exception("/api/purchase failed")
         return jsonify({"error": str(e)}), 500
 
 
+_rating_lock = threading.Lock()
+
+
 @app.route("/api/feedback", methods=["POST"])
 def rate_workflow():
     """Rate a workflow (1-5 stars or up/down vote)."""
+    data = _body()
     try:
-        data = request.json or {}
         workflow_id = data.get("workflow_id")
         if not workflow_id:
             return jsonify({"error": "Missing workflow_id"}), 400
 
-        workflow = matcher.get_workflow_by_id(workflow_id)
-        if not workflow:
-            return jsonify({"error": "Workflow not found"}), 404
-
-        if "rating" in data:
-            new_val = data["rating"]
-            old = workflow.get("rating", 5.0)
-            workflow["rating"] = round((old + new_val) / 2, 1)
-        elif "vote" in data:
-            if data["vote"] == "up":
-                workflow["rating"] = min(5.0, workflow.get("rating", 5.0) + 0.1)
-            elif data["vote"] == "down":
-                workflow["rating"] = max(1.0, workflow.get("rating", 5.0) - 0.1)
-
-        # Persist to Elastic if available
-        if elastic_client:
-            try:
-                elastic_client.update_field(workflow_id, "rating", workflow["rating"])
-            except Exception:
-                pass
+        # Read-modify-write of the rating, one vote at a time
+        with _rating_lock:
+            workflow = matcher.get_workflow_by_id(workflow_id)
+            if not workflow:
+                return jsonify({"error": "Workflow not found"}), 404
+            if update_batcher is not None:
+                # Earlier votes may still be queued and not yet in the index
+                workflow.update(update_batcher.pending(workflow_id))
+
+            # Ratings have one decimal: do the arithmetic in integer tenths so
+            # repeated votes don't accumulate float error (4.8 + 0.1 + ...)
+            old10 = round(workflow.get("rating", 5.0) * 10)
+            new10 = None
+            if "rating" in data:
+                new10 = (old10 + round(data["rating"] * 10) + 1) // 2  # mean, halves round up
+            elif data.get("vote") == "up":
+                new10 = min(50, old10 + 1)
+            elif data.get("vote") == "down":
+                new10 = max(10, old10 - 1)
+            if new10 is not None:
+                workflow["rating"] = new10 / 10
+
+            # Persist to Elastic if available (batched, see update_batcher)
+            if update_batcher is not None:
+                update_batcher.update_field(workflow_id, "rating", workflow["rating"])
+
+        _apply_dynamic_pricing([workflow])
+        _pricing_cache.pop(workflow_id, None)
+        response_cache.invalidate("search_workflows")
+        _invalidate_workflows_cache()
 
         return jsonify({
             "workflow_id": workflow_id,
@@ -348,74 +750,152 @@ def rate_workflow():
 
 # ===== PRIVACY =====
 
+@lru_cache(maxsize=512)
+def _sanitized_body(raw_json: bytes) -> bytes:
+    """
+    Serialized /api/sanitize response for a canonical raw_query.
+    The sanitizer is deterministic, so repeated payloads reuse the body.
+    Kept in-process on purpose: it holds the private half of the query.
+    """
+    raw_query = orjson.loads(raw_json)
+    public_query, private_data = sanitizer.sanitize_query(raw_query)
+    summary = sanitizer.get_sanitization_summary(raw_query, public_query)
+    return orjson.dumps({
+        "public_query": public_query,
+        "private_data": private_data,
+        "sanitization_summary": summary,
+    }, default=_json_default, option=ORJSON_OPTIONS)
+
+
 @app.route("/api/sanitize", methods=["POST"])
 def sanitize_query():
     """Demonstrate the two-layer privacy architecture."""
+    data = _body()
     try:
-        data = request.json or {}
         raw_query = data.get("raw_query", {})
         if not raw_query:
             return jsonify({"error": "Missing raw_query"}), 400
 
-        public_query, private_data = sanitizer.sanitize_query(raw_query)
-        summary = sanitizer.get_sanitization_summary(raw_query, public_query)
-
-        return jsonify({
-            "public_query": public_query,
-            "private_data": private_data,
-            "sanitization_summary": summary,
-        })
+        body = _sanitized_body(orjson.dumps(raw_query, option=orjson.OPT_SORT_KEYS))
+        return app.response_class(body, mimetype="application/json")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 # ===== CLAUDE AGENT =====
 
+def _agent_session():
+    """The calling client's agent and the lock serializing its chat turns."""
+    session_id = request.headers.get(AGENT_SESSION_HEADER) or request.cookies.get("sid") or "default"
+    return agent_sessions.session(session_id)
+
+
+def _agent():
+    """The calling client's agent session."""
+    return _agent_session()[0]
+
+
+def _agent_event_stream(agent, turn_lock, message):
+    """SSE response streaming agent.chat_stream(message)."""
+    def events():
+        try:
+            with turn_lock:
+                for event in agent.chat_stream(message):
+                    yield b"data: " + orjson.dumps(event, default=_json_default) + b"\n\n"
+        except Exception as e:
+            logger.exception("agent chat stream failed")
+            yield b"data: " + orjson.dumps({"type": "error", "error": str(e)}) + b"\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/agent/chat", methods=["POST"])
 def agent_chat():
     """
     Multi-turn conversation with the Claude-powered agent.
     The agent autonomously searches, evaluates, purchases, and executes workflows.
+    Clients sending "Accept: text/event-stream" get the streamed variant
+    (same events as /api/agent/chat/stream). Send an X-Session-Id header to
+    hold a conversation of your own.
 
     Body: { "message": "Help me file my Ohio taxes" }
     """
-    if not agent_instance:
+    if not agent_sessions:
         return jsonify({
             "error": "Agent not configured. Set ANTHROPIC_API_KEY in .env",
         }), 503
 
+    data = _body()
     try:
-        data = request.json or {}
         message = data.get("message", "")
         if not message:
             return jsonify({"error": "Missing message"}), 400
 
-        result = agent_instance.chat(message)
+        agent, turn_lock = _agent_session()
+        if request.accept_mimetypes.best == "text/event-stream":
+            return _agent_event_stream(agent, turn_lock, message)
+
+        with turn_lock:
+            if agent_pool:
+                future = agent_pool.submit(run_chat_job, agent.export_state(), message)
+                result, state = future.result(timeout=AGENT_CHAT_TIMEOUT)
+                agent.load_state(state)
+            else:
+                result = agent.chat(message)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/agent/chat/stream", methods=["POST"])
+def agent_chat_stream():
+    """
+    Streaming agent conversation (Server-Sent Events).
+    Emits text deltas and tool calls as they happen, then a final "done"
+    event carrying the same payload /api/agent/chat returns.
+
+    Body: { "message": "Help me file my Ohio taxes" }
+    """
+    if not agent_sessions:
+        return jsonify({
+            "error": "Agent not configured. Set ANTHROPIC_API_KEY in .env",
+        }), 503
+
+    data = _body()
+    message = data.get("message", "")
+    if not message:
+        return jsonify({"error": "Missing message"}), 400
+
+    return _agent_event_stream(*_agent_session(), message)
+
+
 @app.route("/api/agent/session", methods=["GET"])
 def agent_session():
     """Get current agent session state."""
-    if not agent_instance:
+    if not agent_sessions:
         return jsonify({"error": "Agent not configured"}), 503
-    return jsonify(agent_instance.get_session_summary())
+    return jsonify(_agent().get_session_summary())
 
 
 @app.route("/api/agent/reset", methods=["POST"])
 def agent_reset():
     """Reset the agent session (new conversation)."""
-    if not agent_instance:
+    if not agent_sessions:
         return jsonify({"error": "Agent not configured"}), 503
-    agent_instance.reset_session()
+    agent, turn_lock = _agent_session()
+    with turn_lock:
+        agent.reset_session()
     return jsonify({"success": True, "message": "Session reset"})
 
 
 # ===== COMMERCE =====
 
 @app.route("/api/commerce/balance", methods=["GET"])
+@response_cache.cached(COMMERCE_CACHE_TTL, _user_id_arg)
 def get_balance():
     user_id = request.args.get("user_id", "default_user")
     return jsonify({"user_id": user_id, "balance": commerce.get_balance(user_id)})
@@ -423,15 +903,17 @@ def get_balance():
 
 @app.route("/api/commerce/deposit", methods=["POST"])
 def deposit_credits():
-    data = request.json or {}
-    user_id = data.get("user_id", "default_user")
-    amount = data.get("amount", 0)
+    req = _decode(_deposit_request)
+    user_id, amount = req.user_id, req.amount
     if amount <= 0:
         return jsonify({"error": "Amount must be positive"}), 400
-    return jsonify(commerce.deposit(user_id, amount))
+    result = commerce.deposit(user_id, amount)
+    _invalidate_user_commerce(user_id)
+    return jsonify(result)
 
 
 @app.route("/api/commerce/cart", methods=["GET"])
+@response_cache.cached(COMMERCE_CACHE_TTL, _user_id_arg)
 def view_cart():
     user_id = request.args.get("user_id", "default_user")
     cart = commerce.get_cart(user_id)
@@ -440,9 +922,8 @@ def view_cart():
 
 @app.route("/api/commerce/cart/add", methods=["POST"])
 def add_to_cart():
-    data = request.json or {}
-    user_id = data.get("user_id", "default_user")
-    workflow_id = data.get("workflow_id")
+    req = _decode(_workflow_request)
+    user_id, workflow_id = req.user_id, req.workflow_id
     if not workflow_id:
         return jsonify({"error": "Missing workflow_id"}), 400
 
@@ -450,37 +931,44 @@ def add_to_cart():
     if not workflow:
         return jsonify({"error": "Workflow not found"}), 404
 
-    return jsonify(commerce.add_to_cart(user_id, workflow))
+    result = commerce.add_to_cart(user_id, workflow)
+    response_cache.invalidate("view_cart", user_id)
+    return jsonify(result)
 
 
 @app.route("/api/commerce/cart/remove", methods=["POST"])
 def remove_from_cart():
-    data = request.json or {}
-    user_id = data.get("user_id", "default_user")
-    workflow_id = data.get("workflow_id")
+    req = _decode(_workflow_request)
+    user_id, workflow_id = req.user_id, req.workflow_id
     if not workflow_id:
         return jsonify({"error": "Missing workflow_id"}), 400
-    return jsonify(commerce.remove_from_cart(user_id, workflow_id))
+    result = commerce.remove_from_cart(user_id, workflow_id)
+    response_cache.invalidate("view_cart", user_id)
+    return jsonify(result)
 
 
 @app.route("/api/commerce/checkout", methods=["POST"])
 def checkout():
     """Checkout all items in the shopping cart."""
-    data = request.json or {}
-    user_id = data.get("user_id", "default_user")
-    return jsonify(commerce.checkout_cart(user_id))
+    user_id = _decode(_user_request).user_id
+    result = commerce.checkout_cart(user_id)
+    if result["success"]:
+        response_cache.invalidate("view_cart", user_id)
+        _invalidate_user_commerce(user_id)
+    return jsonify(result)
 
 
 @app.route("/api/commerce/transactions", methods=["GET"])
+@response_cache.cached(COMMERCE_CACHE_TTL, lambda: f"{request.args.get('user_id')}:{request.args.get('limit', 50)}")
 def get_transactions():
     user_id = request.args.get("user_id")
     limit = int(request.args.get("limit", 50))
-    return jsonify({
-        "transactions": commerce.get_transactions(user_id, limit),
-    })
+    body = TX_ENCODER.encode({"transactions": commerce.get_transactions(user_id, limit)})
+    return app.response_class(body, mimetype="application/json")
 
 
 @app.route("/api/commerce/stats", methods=["GET"])
+@response_cache.cached(COMMERCE_CACHE_TTL, lambda: "all")
 def marketplace_stats():
     return jsonify(commerce.get_marketplace_stats())
 
@@ -500,8 +988,8 @@ def estimate_price_and_search():
             "error": "Orchestrator not configured. Ensure config.py and orchestrator.py are present.",
         }), 503
 
+    data = _body()
     try:
-        data = request.get_json()
         if not data or "query" not in data:
             return jsonify({"error": "Missing 'query' field in request body"}), 400
 
@@ -515,9 +1003,7 @@ def estimate_price_and_search():
         return jsonify(response)
 
     except Exception as e:
-        print(f"ERROR in /api/estimate: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("/api/estimate failed")
         return jsonify({"error": str(e), "type": "internal_server_error"}), 500
 
 
@@ -534,8 +1020,8 @@ def buy_solution():
             "error": "Orchestrator not configured. Ensure config.py and orchestrator.py are present.",
         }), 503
 
+    data = _body()
     try:
-        data = request.get_json()
         if not data or "session_id" not in data or "solution_id" not in data:
             return jsonify({"error": "Missing 'session_id' or 'solution_id'"}), 400
 
@@ -548,34 +1034,47 @@ def buy_solution():
         return jsonify(purchase)
 
     except Exception as e:
-        print(f"ERROR in /api/buy: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("/api/buy failed")
         return jsonify({"error": str(e), "type": "internal_server_error"}), 500
 
 
+# Serialized /api/pricing/<id> bodies, precomputed for every loaded workflow.
+# rate_workflow reprices and drops the entry. In Elastic mode entries also
+# expire after PRICING_CACHE_TTL (the agent rates directly in the index).
+_pricing_cache: Dict[str, Tuple[float, bytes]] = {}
+
+
+def _pricing_body(workflow):
+    pricing_info = {
+        "workflow_id": workflow["workflow_id"],
+        "title": workflow["title"],
+        "price_tokens": workflow.get("price_tokens", 0),
+        "tokens_saved": workflow.get("tokens_saved", 0),
+        "savings_percentage": workflow.get("savings_percentage", 0),
+        "roi_percentage": workflow.get("pricing", {}).get("roi_percentage", 0),
+        "pricing": workflow.get("pricing", {}),
+        "avg_tokens_without": workflow.get("avg_tokens_without", 0),
+        "avg_tokens_with": workflow.get("avg_tokens_with", 0),
+        "rating": workflow.get("rating", 0),
+        "usage_count": workflow.get("usage_count", 0),
+    }
+    return orjson.dumps(pricing_info, default=_json_default, option=ORJSON_OPTIONS)
+
+
 @app.route("/api/pricing/<workflow_id>", methods=["GET"])
 def get_workflow_pricing(workflow_id):
     """Get detailed pricing breakdown for a specific workflow."""
     try:
-        workflow = matcher.get_workflow_by_id(workflow_id)
-        if not workflow:
-            return jsonify({"error": "Workflow not found"}), 404
-
-        pricing_info = {
-            "workflow_id": workflow["workflow_id"],
-            "title": workflow["title"],
-            "price_tokens": workflow.get("price_tokens", 0),
-            "tokens_saved": workflow.get("tokens_saved", 0),
-            "savings_percentage": workflow.get("savings_percentage", 0),
-            "roi_percentage": workflow.get("pricing", {}).get("roi_percentage", 0),
-            "pricing": workflow.get("pricing", {}),
-            "avg_tokens_without": workflow.get("avg_tokens_without", 0),
-            "avg_tokens_with": workflow.get("avg_tokens_with", 0),
-            "rating": workflow.get("rating", 0),
-            "usage_count": workflow.get("usage_count", 0),
-        }
-        return jsonify(pricing_info)
+        entry = _pricing_cache.get(workflow_id)
+        if entry is None or (
+            elastic_client is not None and time.monotonic() - entry[0] > PRICING_CACHE_TTL
+        ):
+            workflow = matcher.get_workflow_by_id(workflow_id)
+            if not workflow:
+                return jsonify({"error": "Workflow not found"}), 404
+            entry = (time.monotonic(), _pricing_body(_apply_dynamic_pricing([workflow])[0]))
+            _pricing_cache[workflow_id] = entry
+        return app.response_class(entry[1], mimetype="application/json")
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -804,7 +1303,7 @@ def _simulate_inline(scenario):
             tool_calls.append({
                 "tool_name": tc_data["tool"],
                 "tool_input": tc_data["input"],
-                "result": json.dumps(tc_data["result"]) if isinstance(tc_data["result"], dict) else tc_data["result"],
+                "result": orjson.dumps(tc_data["result"]).decode() if isinstance(tc_data["result"], dict) else tc_data["result"],
                 "latency_ms": tc_data.get("latency_ms", 150),
             })
             tools_called[tc_data["tool"]] = tools_called.get(tc_data["tool"], 0) + 1
@@ -839,44 +1338,64 @@ def sdk_simulate(scenario_id):
     return jsonify({"error": "Scenarios not loaded"}), 500
 
 
+# ===== STARTUP =====
+
+if not _POOL_WORKER:
+    threading.Thread(target=_refresh_clock, name="clock", daemon=True).start()
+
+    for _wf in _apply_dynamic_pricing(matcher.workflows):
+        _pricing_cache[_wf["workflow_id"]] = (time.monotonic(), _pricing_body(_wf))
+
+
 # ===== START =====
 
 if __name__ == "__main__":
     port = int(os.getenv("FLASK_PORT", 5001))
     debug = os.getenv("FLASK_DEBUG", "true").lower() == "true"
 
-    print()
-    print("=" * 60)
-    print("  Agent Workflow Marketplace API")
-    print("=" * 60)
-    print(f"  Workflows loaded : {len(matcher.workflows)}")
-    print(f"  Elasticsearch    : {'connected' if elastic_client else 'off (in-memory fallback)'}")
-    print(f"  Claude Agent     : {'ready' if agent_instance else 'disabled (no API key)'}")
-    print(f"  Orchestrator     : {'ready' if orchestrator else 'disabled'}")
-    print(f"  JINA Embeddings  : {'active' if elastic_client else 'off'}")
-    print(f"  Commerce Engine  : active")
-    print(f"  SDK package      : marktools v{SDK_VERSION}")
-    print(f"  Server           : http://localhost:{port}")
-    print()
-    print("  Endpoints:")
-    print("    POST /api/search          Search workflows (hybrid kNN + BM25)")
-    print("    POST /api/purchase        Purchase workflow")
-    print("    POST /api/feedback        Rate workflow")
-    print("    POST /api/sanitize        Privacy sanitization demo")
-    print("    POST /api/agent/chat      Claude multi-turn agent")
-    print("    GET  /api/agent/session   Agent session state")
-    print("    POST /api/agent/reset     Reset agent")
-    print("    GET  /api/commerce/*      Commerce endpoints")
-    print("    GET  /api/workflows       List all workflows")
-    print("    POST /api/estimate        Estimate pricing (orchestrator)")
-    print("    POST /api/buy             Buy solution (orchestrator)")
-    print("    GET  /api/pricing/<id>    Pricing breakdown")
-    print("    GET  /api/sdk/info        SDK package info")
-    print("    GET  /api/sdk/tools       Tool definitions")
-    print("    GET  /api/sdk/examples    Usage examples")
-    print("    GET  /api/sdk/scenarios   Agent simulation scenarios")
-    print("    GET  /api/sdk/simulate/<id> Run agent simulation")
-    print("    GET  /health              Health check")
-    print("=" * 60)
-
-    app.run(debug=debug, host="0.0.0.0", port=port)
+    banner = "\n".join([
+        "",
+        "=" * 60,
+        "  Agent Workflow Marketplace API",
+        "=" * 60,
+        f"  Workflows loaded : {len(matcher.workflows)}",
+        f"  Elasticsearch    : {'connected' if elastic_client else 'off (in-memory fallback)'}",
+        f"  Claude Agent     : {'ready' if agent_sessions else 'disabled (no API key)'}",
+        f"  Orchestrator     : {'ready' if orchestrator else 'disabled'}",
+        f"  JINA Embeddings  : {'active' if elastic_client else 'off'}",
+        f"  Commerce Engine  : active",
+        f"  SDK package      : marktools v{SDK_VERSION}",
+        f"  Server           : http://localhost:{port}",
+        "",
+        "  Endpoints:",
+        "    POST /api/search          Search workflows (hybrid kNN + BM25)",
+        "    GET  /api/recommend/<id>  Similar workflows",
+        "    POST /api/purchase        Purchase workflow",
+        "    POST /api/feedback        Rate workflow",
+        "    POST /api/sanitize        Privacy sanitization demo",
+        "    POST /api/agent/chat      Claude multi-turn agent",
+        "    POST /api/agent/chat/stream Streaming agent (SSE)",
+        "    GET  /api/agent/session   Agent session state",
+        "    POST /api/agent/reset     Reset agent",
+        "    GET  /api/commerce/*      Commerce endpoints",
+        "    GET  /api/workflows       List all workflows",
+        "    POST /api/estimate        Estimate pricing (orchestrator)",
+        "    POST /api/buy             Buy solution (orchestrator)",
+        "    GET  /api/pricing/<id>    Pricing breakdown",
+        "    GET  /api/sdk/info        SDK package info",
+        "    GET  /api/sdk/tools       Tool definitions",
+        "    GET  /api/sdk/examples    Usage examples",
+        "    GET  /api/sdk/scenarios   Agent simulation scenarios",
+        "    GET  /api/sdk/simulate/<id> Run agent simulation",
+        "    GET  /health              Health check",
+        "=" * 60,
+    ])
+    sys.stdout.write(banner + "\n")
+    sys.stdout.flush()
+
+    if USE_GEVENT:
+        from gevent.pywsgi import WSGIServer
+
+        WSGIServer(("0.0.0.0", port), app).serve_forever()
+    else:
+        app.run(debug=debug, host="0.0.0.0", port=port)
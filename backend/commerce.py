@@ -11,89 +11,223 @@ Manages:
 Prize target: Visa — The Generative Edge: Future of Commerce
 """
 
-import uuid
+import json
+import heapq
+import logging
+import secrets
 import time
+import sqlite3
+import threading
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from operator import attrgetter
+from typing import Dict, Any, Final, Iterable, List, Optional
 
+import msgspec
 
-class Transaction:
-    """A single marketplace transaction."""
+logger = logging.getLogger("commerce")
 
-    def __init__(
-        self,
-        tx_type: str,  # "purchase", "refund", "deposit", "creator_payout"
-        workflow_id: Optional[str],
-        amount: int,
-        buyer_id: str,
-        seller_id: Optional[str] = None,
-        metadata: Optional[Dict] = None,
-    ):
-        self.tx_id = f"tx_{uuid.uuid4().hex[:12]}"
-        self.tx_type = tx_type
-        self.workflow_id = workflow_id
-        self.amount = amount
-        self.buyer_id = buyer_id
-        self.seller_id = seller_id
-        self.metadata = metadata or {}
-        self.timestamp = datetime.now().isoformat()
-        self.status = "completed"
+def _new_tx_id() -> str:
+    return f"tx_{secrets.token_hex(6)}"
+
+
+class Transaction(msgspec.Struct):
+    """
+    A single marketplace transaction.
+
+    A msgspec Struct so transaction lists serialize straight through
+    TX_ENCODER without building an intermediate dict per transaction.
+    The timestamp is kept as a datetime (compared natively when sorting)
+    and only rendered to its ISO string by the encoder.
+    """
+
+    tx_type: str  # "purchase", "refund", "deposit", "creator_payout"
+    workflow_id: Optional[str]
+    amount: int
+    buyer_id: str
+    seller_id: Optional[str] = None
+    metadata: Dict[str, Any] = msgspec.field(default_factory=dict)
+    tx_id: str = msgspec.field(default_factory=_new_tx_id)
+    timestamp: datetime = msgspec.field(default_factory=datetime.now)
+    status: str = "completed"
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Transaction":
+        """Rebuild a recorded transaction (keeps its id and timestamp)."""
+        return msgspec.convert(d, cls)
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "tx_id": self.tx_id,
-            "tx_type": self.tx_type,
-            "workflow_id": self.workflow_id,
-            "amount": self.amount,
-            "buyer_id": self.buyer_id,
-            "seller_id": self.seller_id,
-            "metadata": self.metadata,
-            "timestamp": self.timestamp,
-            "status": self.status,
-        }
+        return msgspec.to_builtins(self)
+
+
+# Keys sorted to match the app-wide JSON provider's output
+TX_ENCODER = msgspec.json.Encoder(order="sorted")
 
 
 class ShoppingCart:
     """Shopping cart for multi-workflow purchases."""
 
+    __slots__ = ("user_id", "items", "created_at")
+
     def __init__(self, user_id: str):
         self.user_id = user_id
-        self.items: List[Dict[str, Any]] = []
+        self.items: Dict[str, Dict[str, Any]] = {}  # workflow_id -> item, in insertion order
         self.created_at = datetime.now().isoformat()
 
     def add_item(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
         wf_id = workflow.get("workflow_id")
         # Don't add duplicates
-        if any(item["workflow_id"] == wf_id for item in self.items):
+        if wf_id in self.items:
             return {"error": "Workflow already in cart", "workflow_id": wf_id}
 
-        self.items.append({
+        self.items[wf_id] = {
             "workflow_id": wf_id,
             "title": workflow.get("title", ""),
             "token_cost": workflow.get("token_cost", 0),
             "rating": workflow.get("rating", 0),
             "added_at": datetime.now().isoformat(),
-        })
+        }
         return {"success": True, "cart_size": len(self.items), "total": self.get_total()}
 
     def remove_item(self, workflow_id: str) -> Dict[str, Any]:
-        self.items = [i for i in self.items if i["workflow_id"] != workflow_id]
+        self.items.pop(workflow_id, None)
         return {"success": True, "cart_size": len(self.items), "total": self.get_total()}
 
     def get_total(self) -> int:
-        return sum(item["token_cost"] for item in self.items)
+        return sum(item["token_cost"] for item in self.items.values())
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "user_id": self.user_id,
-            "items": self.items,
+            "items": list(self.items.values()),
             "item_count": len(self.items),
             "total_cost": self.get_total(),
             "created_at": self.created_at,
         }
 
-    def clear(self):
-        self.items = []
+    def clear(self) -> None:
+        self.items = {}
+
+
+class CommerceJournal:
+    """
+    Write-behind SQLite persistence for the commerce engine.
+
+    Mutations are buffered in memory and flushed every FLUSH_INTERVAL seconds
+    in one SQLite transaction (executemany), so a checkout of N items costs
+    one commit, not N. The database runs in WAL mode so reads never block
+    the writer.
+    """
+
+    FLUSH_INTERVAL: Final[float] = 0.25  # seconds
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS transactions (
+                    tx_id TEXT PRIMARY KEY, tx_type TEXT, workflow_id TEXT,
+                    amount INTEGER, buyer_id TEXT, seller_id TEXT,
+                    metadata TEXT, timestamp TEXT, status TEXT
+                );
+                CREATE TABLE IF NOT EXISTS balances (
+                    user_id TEXT PRIMARY KEY, balance INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS creator_earnings (
+                    creator_id TEXT PRIMARY KEY, earned INTEGER
+                );
+            """)
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one writer on the connection at a time
+        self._pending_txs: List[tuple] = []
+        self._pending_balances: Dict[str, int] = {}
+        self._pending_earnings: Dict[str, int] = {}
+
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(target=self._run, name="commerce-journal", daemon=True)
+        self._flusher.start()
+
+    def load(self) -> Dict[str, Any]:
+        """Read persisted state: balances, creator earnings, transactions (oldest first)."""
+        balances = dict(self.conn.execute("SELECT user_id, balance FROM balances"))
+        earnings = dict(self.conn.execute("SELECT creator_id, earned FROM creator_earnings"))
+        rows = self.conn.execute(
+            "SELECT tx_id, tx_type, workflow_id, amount, buyer_id, seller_id, metadata, timestamp, status "
+            "FROM transactions ORDER BY rowid"
+        )
+        transactions = [
+            Transaction.from_dict({
+                "tx_id": r[0], "tx_type": r[1], "workflow_id": r[2], "amount": r[3],
+                "buyer_id": r[4], "seller_id": r[5], "metadata": json.loads(r[6] or "{}"),
+                "timestamp": r[7], "status": r[8],
+            })
+            for r in rows
+        ]
+        return {"balances": balances, "creator_earnings": earnings, "transactions": transactions}
+
+    def record(
+        self,
+        txs: Iterable[Transaction] = (),
+        balances: Optional[Dict[str, int]] = None,
+        earnings: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Buffer transactions and/or the latest balance values for the next flush."""
+        with self._lock:
+            self._pending_txs.extend(
+                (
+                    tx.tx_id, tx.tx_type, tx.workflow_id, tx.amount, tx.buyer_id,
+                    tx.seller_id, json.dumps(tx.metadata), tx.timestamp.isoformat(), tx.status,
+                )
+                for tx in txs
+            )
+            if balances:
+                self._pending_balances.update(balances)
+            if earnings:
+                self._pending_earnings.update(earnings)
+
+    def flush(self) -> None:
+        """Write everything buffered so far in a single SQLite transaction."""
+        with self._flush_lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        with self._lock:
+            txs, self._pending_txs = self._pending_txs, []
+            balances, self._pending_balances = self._pending_balances, {}
+            earnings, self._pending_earnings = self._pending_earnings, {}
+        if not (txs or balances or earnings):
+            return
+
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO transactions VALUES (?,?,?,?,?,?,?,?,?)", txs)
+            self.conn.executemany(
+                "INSERT INTO balances VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET balance = excluded.balance",
+                balances.items(),
+            )
+            self.conn.executemany(
+                "INSERT INTO creator_earnings VALUES (?, ?) "
+                "ON CONFLICT(creator_id) DO UPDATE SET earned = excluded.earned",
+                earnings.items(),
+            )
+
+    def close(self) -> None:
+        """Stop the flusher and write any remaining buffered changes."""
+        self._stopped.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        self.conn.close()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.FLUSH_INTERVAL):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("journal flush failed")
 
 
 class CommerceEngine:
@@ -104,18 +238,67 @@ class CommerceEngine:
     """
 
     # Platform takes 15% commission, creator gets 85%
-    PLATFORM_COMMISSION = 0.15
+    PLATFORM_COMMISSION: Final[float] = 0.15
+    CREATOR_SHARE: Final[float] = 1 - PLATFORM_COMMISSION
 
-    def __init__(self):
+    # Per-user state is guarded by one of LOCK_SHARDS locks picked by user_id
+    LOCK_SHARDS: Final[int] = 64
+
+    def __init__(self, journal_path: Optional[str] = None):
         # In-memory stores (would be DB in production)
         self.user_balances: Dict[str, int] = {}
         self.transactions: List[Transaction] = []
         self.carts: Dict[str, ShoppingCart] = {}
         self.creator_earnings: Dict[str, int] = {}
 
+        # Secondary indices over self.transactions (each list in append order)
+        # and running aggregates, so per-user history and stats skip full scans
+        self._tx_by_user: Dict[str, List[Transaction]] = defaultdict(list)  # buyer or seller
+        self._tx_by_seller: Dict[str, List[Transaction]] = defaultdict(list)
+        self._stats = {"total_volume": 0, "platform_revenue": 0, "buyers": set(), "creators": set()}
+        self._tx_lock = threading.Lock()
+
+        # Sharded per-user locks (re-entrant: checkout_cart calls purchase_workflow)
+        # plus one small lock for the shared creator_earnings counters
+        self._locks = [threading.RLock() for _ in range(self.LOCK_SHARDS)]
+        self._earnings_lock = threading.Lock()
+
+        # Optional SQLite persistence (write-behind, see CommerceJournal)
+        self.journal = CommerceJournal(journal_path) if journal_path else None
+        if self.journal:
+            state = self.journal.load()
+            self.user_balances.update(state["balances"])
+            self.creator_earnings.update(state["creator_earnings"])
+            self._record_txs(state["transactions"])
+
         # Seed a default user
-        self.user_balances["default_user"] = 5000
-        self.user_balances["demo_agent"] = 10000
+        self.user_balances.setdefault("default_user", 5000)
+        self.user_balances.setdefault("demo_agent", 10000)
+
+    def _lock(self, user_id: str) -> threading.RLock:
+        return self._locks[hash(user_id) % self.LOCK_SHARDS]
+
+    def _record_txs(self, txs: List[Transaction]) -> None:
+        """Append transactions and update the indices and running stats."""
+        with self._tx_lock:
+            self.transactions.extend(txs)
+            stats = self._stats
+            for tx in txs:
+                self._tx_by_user[tx.buyer_id].append(tx)
+                stats["buyers"].add(tx.buyer_id)
+                if tx.seller_id:
+                    if tx.seller_id != tx.buyer_id:
+                        self._tx_by_user[tx.seller_id].append(tx)
+                    self._tx_by_seller[tx.seller_id].append(tx)
+                    stats["creators"].add(tx.seller_id)
+                if tx.tx_type == "purchase":
+                    stats["total_volume"] += tx.amount
+                    stats["platform_revenue"] += tx.metadata.get("platform_fee", 0)
+
+    def close(self) -> None:
+        """Flush and close the journal, if any."""
+        if self.journal:
+            self.journal.close()
 
     # ------------------------------------------------------------------
     # User balance management
@@ -126,12 +309,16 @@ class CommerceEngine:
 
     def deposit(self, user_id: str, amount: int) -> Dict[str, Any]:
         """Add credits to user's balance."""
-        self.user_balances[user_id] = self.user_balances.get(user_id, 0) + amount
-        tx = Transaction("deposit", None, amount, user_id)
-        self.transactions.append(tx)
+        with self._lock(user_id):
+            self.user_balances[user_id] = self.user_balances.get(user_id, 0) + amount
+            new_balance = self.user_balances[user_id]
+            tx = Transaction("deposit", None, amount, user_id)
+            self._record_txs([tx])
+            if self.journal:
+                self.journal.record([tx], balances={user_id: new_balance})
         return {
             "success": True,
-            "new_balance": self.user_balances[user_id],
+            "new_balance": new_balance,
             "tx_id": tx.tx_id,
         }
 
@@ -150,117 +337,141 @@ class CommerceEngine:
         Deducts from buyer, pays creator (minus commission).
         """
         cost = workflow.get("token_cost", 0)
+        with self._lock(user_id):
+            balance = self.get_balance(user_id)
+            if balance < cost:
+                return {
+                    "success": False,
+                    "error": "Insufficient balance",
+                    "balance": balance,
+                    "cost": cost,
+                    "shortfall": cost - balance,
+                }
+            return self._purchase_many(user_id, [workflow], creator_id)[0]
+
+    def _purchase_many(
+        self,
+        user_id: str,
+        workflows: List[Dict[str, Any]],
+        creator_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Buy several workflows in one critical section.
+        The caller holds the user's lock and has checked the balance covers
+        the total; the buyer is debited once, creator earnings are updated
+        once per creator and all transactions are recorded together.
+        """
         balance = self.get_balance(user_id)
-
-        if balance < cost:
-            return {
-                "success": False,
-                "error": "Insufficient balance",
-                "balance": balance,
-                "cost": cost,
-                "shortfall": cost - balance,
-            }
-
-        # Deduct from buyer
-        self.user_balances[user_id] -= cost
-
-        # Pay creator (if any)
-        creator = creator_id or workflow.get("creator_id", "marketplace")
-        creator_share = int(cost * (1 - self.PLATFORM_COMMISSION))
-        self.creator_earnings[creator] = self.creator_earnings.get(creator, 0) + creator_share
-
-        # Record transaction
-        tx = Transaction(
-            tx_type="purchase",
-            workflow_id=workflow.get("workflow_id"),
-            amount=cost,
-            buyer_id=user_id,
-            seller_id=creator,
-            metadata={
+        earned: Dict[str, int] = {}
+        txs: List[Transaction] = []
+        receipts: List[Dict[str, Any]] = []
+
+        for workflow in workflows:
+            cost = workflow.get("token_cost", 0)
+            balance -= cost
+
+            # Pay creator (if any)
+            creator = creator_id or workflow.get("creator_id", "marketplace")
+            creator_share = int(cost * self.CREATOR_SHARE)
+            earned[creator] = earned.get(creator, 0) + creator_share
+
+            tx = Transaction(
+                tx_type="purchase",
+                workflow_id=workflow.get("workflow_id"),
+                amount=cost,
+                buyer_id=user_id,
+                seller_id=creator,
+                metadata={
+                    "title": workflow.get("title"),
+                    "creator_share": creator_share,
+                    "platform_fee": cost - creator_share,
+                    "token_savings": workflow.get("token_comparison", {}).get("savings_percent", 0),
+                },
+            )
+            txs.append(tx)
+            receipts.append({
+                "success": True,
+                "tx_id": tx.tx_id,
+                "workflow_id": workflow.get("workflow_id"),
                 "title": workflow.get("title"),
+                "cost": cost,
+                "new_balance": balance,
                 "creator_share": creator_share,
                 "platform_fee": cost - creator_share,
-                "token_savings": workflow.get("token_comparison", {}).get("savings_percent", 0),
-            },
-        )
-        self.transactions.append(tx)
-
-        return {
-            "success": True,
-            "tx_id": tx.tx_id,
-            "workflow_id": workflow.get("workflow_id"),
-            "title": workflow.get("title"),
-            "cost": cost,
-            "new_balance": self.user_balances[user_id],
-            "creator_share": creator_share,
-            "platform_fee": cost - creator_share,
-        }
+            })
+
+        self.user_balances[user_id] = balance
+        self._record_txs(txs)
+        with self._earnings_lock:
+            for creator, share in earned.items():
+                self.creator_earnings[creator] = self.creator_earnings.get(creator, 0) + share
+            if self.journal:
+                # Still under the lock, so creator totals reach the journal in
+                # the order they were computed (a later total is never overwritten)
+                creator_totals = {creator: self.creator_earnings[creator] for creator in earned}
+                self.journal.record(txs, balances={user_id: balance}, earnings=creator_totals)
+        return receipts
 
     def checkout_cart(self, user_id: str) -> Dict[str, Any]:
         """Purchase all items in user's cart."""
-        cart = self.carts.get(user_id)
-        if not cart or not cart.items:
-            return {"success": False, "error": "Cart is empty"}
+        with self._lock(user_id):
+            cart = self.carts.get(user_id)
+            if not cart or not cart.items:
+                return {"success": False, "error": "Cart is empty"}
+
+            total = cart.get_total()
+            balance = self.get_balance(user_id)
+
+            if balance < total:
+                return {
+                    "success": False,
+                    "error": "Insufficient balance for cart",
+                    "balance": balance,
+                    "cart_total": total,
+                    "shortfall": total - balance,
+                }
+
+            receipts = self._purchase_many(user_id, list(cart.items.values()))
+            cart.clear()
 
-        total = cart.get_total()
-        balance = self.get_balance(user_id)
-
-        if balance < total:
             return {
-                "success": False,
-                "error": "Insufficient balance for cart",
-                "balance": balance,
-                "cart_total": total,
-                "shortfall": total - balance,
+                "success": True,
+                "items_purchased": len(receipts),
+                "total_spent": total,
+                "new_balance": self.get_balance(user_id),
+                "receipts": receipts,
             }
 
-        # Process each item
-        receipts = []
-        for item in cart.items:
-            receipt = self.purchase_workflow(user_id, item)
-            receipts.append(receipt)
-
-        cart.clear()
-
-        return {
-            "success": True,
-            "items_purchased": len(receipts),
-            "total_spent": total,
-            "new_balance": self.get_balance(user_id),
-            "receipts": receipts,
-        }
-
     # ------------------------------------------------------------------
     # Shopping cart
     # ------------------------------------------------------------------
 
     def get_cart(self, user_id: str) -> ShoppingCart:
-        if user_id not in self.carts:
-            self.carts[user_id] = ShoppingCart(user_id)
-        return self.carts[user_id]
+        with self._lock(user_id):
+            if user_id not in self.carts:
+                self.carts[user_id] = ShoppingCart(user_id)
+            return self.carts[user_id]
 
     def add_to_cart(self, user_id: str, workflow: Dict[str, Any]) -> Dict[str, Any]:
-        cart = self.get_cart(user_id)
-        return cart.add_item(workflow)
+        with self._lock(user_id):
+            return self.get_cart(user_id).add_item(workflow)
 
     def remove_from_cart(self, user_id: str, workflow_id: str) -> Dict[str, Any]:
-        cart = self.get_cart(user_id)
-        return cart.remove_item(workflow_id)
+        with self._lock(user_id):
+            return self.get_cart(user_id).remove_item(workflow_id)
 
     # ------------------------------------------------------------------
     # Transaction history
     # ------------------------------------------------------------------
 
-    def get_transactions(self, user_id: Optional[str] = None, limit: int = 50) -> List[Dict]:
-        txs = self.transactions
-        if user_id:
-            txs = [t for t in txs if t.buyer_id == user_id or t.seller_id == user_id]
-        txs = sorted(txs, key=lambda t: t.timestamp, reverse=True)[:limit]
-        return [t.to_dict() for t in txs]
+    def get_transactions(self, user_id: Optional[str] = None, limit: int = 50) -> List[Transaction]:
+        """Newest-first transactions; encode with TX_ENCODER for responses."""
+        txs = self._tx_by_user.get(user_id, []) if user_id else self.transactions
+        return heapq.nlargest(limit, txs, key=attrgetter("timestamp"))
 
     def get_creator_dashboard(self, creator_id: str) -> Dict[str, Any]:
         """Revenue dashboard for workflow creators."""
-        creator_txs = [t for t in self.transactions if t.seller_id == creator_id]
+        creator_txs = self._tx_by_seller.get(creator_id, [])
         total_earned = self.creator_earnings.get(creator_id, 0)
         total_sales = len(creator_txs)
         workflows_sold = list(set(t.workflow_id for t in creator_txs if t.workflow_id))
@@ -278,18 +489,13 @@ class CommerceEngine:
     # ------------------------------------------------------------------
 
     def get_marketplace_stats(self) -> Dict[str, Any]:
-        """Aggregate marketplace statistics."""
-        total_txs = len(self.transactions)
-        total_volume = sum(t.amount for t in self.transactions if t.tx_type == "purchase")
-        unique_buyers = len(set(t.buyer_id for t in self.transactions))
-        unique_creators = len(set(t.seller_id for t in self.transactions if t.seller_id))
-
-        return {
-            "total_transactions": total_txs,
-            "total_volume_tokens": total_volume,
-            "unique_buyers": unique_buyers,
-            "unique_creators": unique_creators,
-            "platform_revenue": sum(
-                t.metadata.get("platform_fee", 0) for t in self.transactions if t.tx_type == "purchase"
-            ),
-        }
+        """Aggregate marketplace statistics (read from the running totals)."""
+        with self._tx_lock:
+            stats = self._stats
+            return {
+                "total_transactions": len(self.transactions),
+                "total_volume_tokens": stats["total_volume"],
+                "unique_buyers": len(stats["buyers"]),
+                "unique_creators": len(stats["creators"]),
+                "platform_revenue": stats["platform_revenue"],
+            }
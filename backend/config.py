@@ -4,8 +4,9 @@ Loads environment variables and provides singleton service instances.
 """
 
 import os
+import functools
+import threading
 from dotenv import load_dotenv
-from typing import Optional
 
 # Load environment variables from .env file
 load_dotenv()
@@ -40,6 +41,7 @@ class Config:
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
     REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
     CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "3600"))  # 1 hour
+    REDIS_URL: str = os.getenv("REDIS_URL", "")  # shared embedding cache tier when set
 
     # Flask Settings
     FLASK_ENV: str = os.getenv("FLASK_ENV", "development")
@@ -80,63 +82,68 @@ class Config:
         return True
 
 
-# Singleton instances (lazy loaded)
-_claude_service: Optional['ClaudeService'] = None
-_embedding_service: Optional['EmbeddingService'] = None
-_elasticsearch_service: Optional['ElasticsearchService'] = None
+def _singleton(factory):
+    """
+    Build factory() on first call and return that same instance afterwards.
+    Double-checked locking, so threads racing on the first call still share
+    one instance; later calls take no lock.
+    """
+    lock = threading.Lock()
+    instance = None
 
+    @functools.wraps(factory)
+    def get():
+        nonlocal instance
+        if instance is None:
+            with lock:
+                if instance is None:
+                    instance = factory()
+        return instance
 
-def get_claude_service():
-    """Get singleton instance of ClaudeService."""
-    global _claude_service
+    return get
 
-    if _claude_service is None:
-        from services.claude_service import ClaudeService
-        _claude_service = ClaudeService(
-            api_key=Config.ANTHROPIC_API_KEY,
-            model=Config.CLAUDE_MODEL,
-            max_tokens=Config.CLAUDE_MAX_TOKENS
-        )
 
-    return _claude_service
+@_singleton
+def get_claude_service():
+    """Get singleton instance of ClaudeService."""
+    from services.claude_service import ClaudeService
+    return ClaudeService(
+        api_key=Config.ANTHROPIC_API_KEY,
+        model=Config.CLAUDE_MODEL,
+        max_tokens=Config.CLAUDE_MAX_TOKENS
+    )
 
 
+@_singleton
 def get_embedding_service():
     """Get singleton instance of EmbeddingService."""
-    global _embedding_service
-
-    if _embedding_service is None:
-        from services.embedding_service import EmbeddingService
-        _embedding_service = EmbeddingService(
-            api_key=Config.JINA_API_KEY,
-            model=Config.JINA_MODEL,
-            embedding_dim=Config.JINA_EMBEDDING_DIM
-        )
-
-    return _embedding_service
+    from services.embedding_cache import EmbeddingCache
+    from services.embedding_service import EmbeddingService
+    return EmbeddingService(
+        api_key=Config.JINA_API_KEY,
+        model=Config.JINA_MODEL,
+        embedding_dim=Config.JINA_EMBEDDING_DIM,
+        cache=EmbeddingCache(redis_url=Config.REDIS_URL or None)
+    )
 
 
+@_singleton
 def get_elasticsearch_service():
     """Get singleton instance of ElasticsearchService."""
-    global _elasticsearch_service
-
-    if _elasticsearch_service is None:
-        from services.elasticsearch_service import ElasticsearchService
-
-        # Prefer ELASTIC_CLOUD_ID if set, otherwise fall back to ELASTICSEARCH_HOST
-        index_name = Config.ELASTIC_INDEX_NAME or Config.ELASTICSEARCH_INDEX
-
-        _elasticsearch_service = ElasticsearchService(
-            index_name=index_name,
-            embedding_dim=Config.JINA_EMBEDDING_DIM,
-            cloud_id=Config.ELASTIC_CLOUD_ID,
-            api_key=Config.ELASTIC_API_KEY,
-            host=Config.ELASTICSEARCH_HOST,
-            username=Config.ELASTICSEARCH_USERNAME,
-            password=Config.ELASTICSEARCH_PASSWORD
-        )
-
-    return _elasticsearch_service
+    from services.elasticsearch_service import ElasticsearchService
+
+    # Prefer ELASTIC_CLOUD_ID if set, otherwise fall back to ELASTICSEARCH_HOST
+    index_name = Config.ELASTIC_INDEX_NAME or Config.ELASTICSEARCH_INDEX
+
+    return ElasticsearchService(
+        index_name=index_name,
+        embedding_dim=Config.JINA_EMBEDDING_DIM,
+        cloud_id=Config.ELASTIC_CLOUD_ID,
+        api_key=Config.ELASTIC_API_KEY,
+        host=Config.ELASTICSEARCH_HOST,
+        username=Config.ELASTICSEARCH_USERNAME,
+        password=Config.ELASTICSEARCH_PASSWORD
+    )
 
 
 def initialize_services():
@@ -11,25 +11,48 @@ Prize targets: Elastic (full stack), JINA embeddings, Elastic Cloud
 
 import os
 import json
+import base64
+import binascii
+import functools
+import threading
+import time
 import requests
 import numpy as np
-from typing import List, Dict, Any, Optional
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Union
 from elasticsearch import Elasticsearch
+from elasticsearch.helpers import streaming_bulk
+
+from http_pool import ES_CONNECTIONS_PER_NODE, get_session
 
 
 # ---------------------------------------------------------------------------
 # JINA Embeddings
 # ---------------------------------------------------------------------------
+EMBED_BATCH_SIZE = 64  # texts per JINA request when embedding documents
+EMBED_CONCURRENCY = 8  # JINA requests in flight at once
+QUERY_EMBED_CACHE_SIZE = 4096  # recent query texts whose embeddings are kept
 
 class JinaEmbedder:
     """Generate embeddings via JINA Embeddings API."""
 
     API_URL = "https://api.jina.ai/v1/embeddings"
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "jina-embeddings-v3"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "jina-embeddings-v3",
+        session: Optional[requests.Session] = None,
+    ):
         self.api_key = api_key or os.getenv("JINA_API_KEY", "")
         self.model = model
+        self.session = session or get_session()
         self.dimension = 1024  # jina-embeddings-v3 output dim
+        # Least recently used first; query text -> embedding
+        self._query_cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._query_lock = threading.Lock()
 
     def embed(self, texts: List[str], task: str = "retrieval.passage") -> List[List[float]]:
         """
@@ -48,18 +71,62 @@ class JinaEmbedder:
             "input": texts,
             "task": task,
         }
-        resp = requests.post(self.API_URL, headers=headers, json=payload, timeout=30)
+        resp = self.session.post(self.API_URL, headers=headers, data=orjson.dumps(payload), timeout=30)
         resp.raise_for_status()
-        data = resp.json()
-        return [item["embedding"] for item in data["data"]]
+        data = orjson.loads(resp.content)
+        vectors = np.array([item["embedding"] for item in data["data"]], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).tolist()
 
     def embed_query(self, text: str) -> List[float]:
-        """Embed a single search query."""
-        return self.embed([text], task="retrieval.query")[0]
+        """Embed a single search query, reusing recent embeddings of the same text."""
+        with self._query_lock:
+            cached = self._query_cache.get(text)
+            if cached is not None:
+                self._query_cache.move_to_end(text)
+                return list(cached)
+
+        vector = self.embed([text], task="retrieval.query")[0]
+        self._cache_queries([text], [vector])
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several search queries; cache misses go to JINA in one request."""
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        with self._query_lock:
+            for i, text in enumerate(texts):
+                cached = self._query_cache.get(text)
+                if cached is not None:
+                    self._query_cache.move_to_end(text)
+                    vectors[i] = list(cached)
+
+        misses = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if misses:
+            fresh = dict(zip(misses, self.embed(misses, task="retrieval.query")))
+            self._cache_queries(misses, [fresh[t] for t in misses])
+            vectors = [v if v is not None else fresh[t] for t, v in zip(texts, vectors)]
+        return vectors
+
+    def _cache_queries(self, texts: List[str], vectors: List[List[float]]):
+        with self._query_lock:
+            for text, vector in zip(texts, vectors):
+                self._query_cache[text] = tuple(vector)
+                self._query_cache.move_to_end(text)
+            while len(self._query_cache) > QUERY_EMBED_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """Embed a batch of documents / workflow descriptions."""
-        return self.embed(texts, task="retrieval.passage")
+        """
+        Embed documents / workflow descriptions, EMBED_BATCH_SIZE texts per
+        request with up to EMBED_CONCURRENCY requests in flight.
+        """
+        if len(texts) <= EMBED_BATCH_SIZE:
+            return self.embed(texts, task="retrieval.passage")
+        chunks = [texts[i:i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=min(EMBED_CONCURRENCY, len(chunks))) as pool:
+            results = pool.map(lambda chunk: self.embed(chunk, task="retrieval.passage"), chunks)
+            return [vec for chunk_vectors in results for vec in chunk_vectors]
 
 
 # ---------------------------------------------------------------------------
@@ -92,11 +159,14 @@ INDEX_SETTINGS = {
             "tags":           {"type": "keyword"},
 
             # ---- dense vector (JINA) ----
+            # vectors are L2-normalized by JinaEmbedder, so dot_product
+            # ranks like cosine; int8_hnsw quantizes the HNSW copy (~4x smaller)
             "embedding": {
                 "type": "dense_vector",
                 "dims": 1024,
                 "index": True,
-                "similarity": "cosine",
+                "similarity": "dot_product",
+                "index_options": {"type": "int8_hnsw"},
             },
 
             # ---- full workflow payload ----
@@ -110,6 +180,108 @@ INDEX_SETTINGS = {
 }
 
 
+# Reciprocal Rank Fusion parameters for hybrid_search
+RRF_RANK_WINDOW_SIZE = 100
+RRF_RANK_CONSTANT = 20
+RRF_KNN_K = 50
+RRF_KNN_NUM_CANDIDATES = 200
+
+# Constant parts of the hybrid search body, shared (never mutated) across requests
+HYBRID_FILTER_FIELDS = ("task_type", "state", "year", "location", "platform", "domain")
+HYBRID_BM25_FIELDS = ["title^3", "description^2", "domain_knowledge", "tags^2"]
+SOURCE_WITHOUT_EMBEDDING = {"excludes": ["embedding"]}
+
+
+# Semantic query cache: reuse hits for near-duplicate query embeddings
+QUERY_CACHE_SIZE = 1024
+QUERY_CACHE_THRESHOLD = 0.97
+QUERY_CACHE_TTL = 30  # seconds; bounds staleness from writes this process doesn't see
+
+
+class SemanticQueryCache:
+    """
+    Ring buffer of recent (query vector, hits) pairs.
+    A lookup returns the stored hits when a cached query with the same
+    filters/top_k has cosine similarity >= threshold and was stored less
+    than ttl seconds ago.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        size: int = QUERY_CACHE_SIZE,
+        threshold: float = QUERY_CACHE_THRESHOLD,
+        ttl: float = QUERY_CACHE_TTL,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self._vectors = np.zeros((size, dim), dtype=np.float32)
+        self._scopes: List[Optional[str]] = [None] * size
+        self._hits: List[Optional[List[Dict[str, Any]]]] = [None] * size
+        self._expires = np.zeros(size, dtype=np.float64)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def scope(filters: Optional[Dict[str, Any]], top_k: int) -> str:
+        return json.dumps([filters or {}, top_k], sort_keys=True, default=str)
+
+    @staticmethod
+    def _unit(vector: List[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def get(self, vector: List[float], scope: str) -> Optional[List[Dict[str, Any]]]:
+        v = self._unit(vector)
+        with self._lock:
+            sims = self._vectors @ v
+            sims[self._expires < time.monotonic()] = -1.0
+            for i in np.argsort(sims)[::-1]:
+                if sims[i] < self.threshold:
+                    break
+                if self._scopes[i] == scope:
+                    return [dict(doc) for doc in self._hits[i]]
+        return None
+
+    def put(self, vector: List[float], scope: str, hits: List[Dict[str, Any]]):
+        with self._lock:
+            i = self._next
+            self._vectors[i] = self._unit(vector)
+            self._scopes[i] = scope
+            self._hits[i] = [dict(doc) for doc in hits]
+            self._expires[i] = time.monotonic() + self.ttl
+            self._next = (i + 1) % len(self._scopes)
+
+    def clear(self):
+        with self._lock:
+            self._vectors[:] = 0
+            self._scopes = [None] * len(self._scopes)
+            self._hits = [None] * len(self._hits)
+            self._expires[:] = 0
+            self._next = 0
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_api_key(raw_key: str) -> Union[str, Tuple[str, str]]:
+    """
+    Parse API key — handles both raw base64 and id:key tuple formats.
+    Elastic Python client accepts either a string or a tuple (id, key).
+    Raises ValueError for a key that is neither, instead of sending it as-is.
+    """
+    try:
+        decoded = base64.b64decode(raw_key, validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        if ":" in raw_key:
+            key_id, key = raw_key.split(":", 1)
+            return (key_id, key)
+        raise ValueError("ELASTIC_API_KEY is neither a base64 API key nor id:key") from None
+    if ":" in decoded:
+        key_id, key = decoded.split(":", 1)
+        return (key_id, key)
+    return raw_key
+
+
 class ElasticClient:
     """
     Wraps Elasticsearch for the Workflow Marketplace.
@@ -122,49 +294,45 @@ class ElasticClient:
         api_key: Optional[str] = None,
         index_name: Optional[str] = None,
         jina_embedder: Optional[JinaEmbedder] = None,
+        inference_id: Optional[str] = None,
     ):
         self.cloud_id = cloud_id or os.getenv("ELASTIC_CLOUD_ID", "")
         self.api_key = api_key or os.getenv("ELASTIC_API_KEY", "")
         self.index_name = index_name or os.getenv("ELASTIC_INDEX", "workflows")
         self.embedder = jina_embedder or JinaEmbedder()
+        # Elastic inference endpoint for JINA query embeddings; when set,
+        # hybrid search sends only the query text and Elastic embeds it
+        self.inference_id = inference_id or os.getenv("ELASTIC_INFERENCE_ID", "")
+        self.query_cache = SemanticQueryCache(self.embedder.dimension)
 
         # Support both Cloud ID format and direct URL
         if self.cloud_id and self.api_key:
+            api_key = _parse_api_key(self.api_key)
             if self.cloud_id.startswith("http"):
                 # Direct Elasticsearch endpoint URL
                 self.es = Elasticsearch(
                     self.cloud_id,
-                    api_key=self._parse_api_key(self.api_key),
+                    api_key=api_key,
                     verify_certs=True,
+                    connections_per_node=ES_CONNECTIONS_PER_NODE,
+                    http_compress=True,
+                    request_timeout=60,
                 )
             else:
                 # Standard Cloud ID (deployment-name:base64)
                 self.es = Elasticsearch(
                     cloud_id=self.cloud_id,
-                    api_key=self._parse_api_key(self.api_key),
+                    api_key=api_key,
+                    connections_per_node=ES_CONNECTIONS_PER_NODE,
+                    http_compress=True,
+                    request_timeout=60,
                 )
         else:
             # Fallback to localhost for dev
-            self.es = Elasticsearch("http://localhost:9200")
+            self.es = Elasticsearch("http://localhost:9200", http_compress=True, request_timeout=60)
 
         print(f"[elastic] connected — index={self.index_name}")
 
-    @staticmethod
-    def _parse_api_key(raw_key: str):
-        """
-        Parse API key — handles both raw base64 and id:key tuple formats.
-        Elastic Python client accepts either a string or a tuple (id, key).
-        """
-        import base64
-        try:
-            decoded = base64.b64decode(raw_key).decode("utf-8")
-            if ":" in decoded:
-                parts = decoded.split(":", 1)
-                return (parts[0], parts[1])
-        except Exception:
-            pass
-        return raw_key
-
     # ------------------------------------------------------------------
     # Index management
     # ------------------------------------------------------------------
@@ -203,17 +371,48 @@ class ElasticClient:
         return " | ".join(parts)
 
     def ingest_workflows(self, workflows: List[Dict[str, Any]]):
-        """Embed workflows with JINA and bulk-index into Elasticsearch."""
+        """
+        Embed workflows with JINA and bulk-index into Elasticsearch.
+        Each workflow dict is indexed as-is, with its vector attached in place
+        under "embedding".
+        """
         texts = [self._workflow_to_text(wf) for wf in workflows]
         print(f"[elastic] embedding {len(texts)} workflows via JINA …")
         embeddings = self.embedder.embed_documents(texts)
 
         for wf, emb in zip(workflows, embeddings):
-            doc = {**wf, "embedding": emb}
-            self.es.index(index=self.index_name, id=wf["workflow_id"], document=doc)
+            wf["embedding"] = emb
+        actions = (
+            {"_op_type": "index", "_index": self.index_name, "_id": wf["workflow_id"], "_source": wf}
+            for wf in workflows
+        )
+        failed = []
+        for ok, result in streaming_bulk(
+            self.es,
+            actions,
+            chunk_size=500,
+            max_chunk_bytes=20 * 1024 * 1024,
+            raise_on_error=False,
+        ):
+            if not ok:
+                failed.append(result["index"]["_id"])
+        if failed:
+            print(f"[elastic] failed to index {failed}")
 
         self.es.indices.refresh(index=self.index_name)
-        print(f"[elastic] indexed {len(workflows)} workflows")
+        self.query_cache.clear()
+        print(f"[elastic] indexed {len(workflows) - len(failed)} workflows")
+
+    def force_merge(self):
+        """
+        Merge the index to one segment = one HNSW graph per shard.
+        For one-off setup after ingest (expensive on a live index, and not
+        allowed on serverless); failures are ignored.
+        """
+        try:
+            self.es.indices.forcemerge(index=self.index_name, max_num_segments=1)
+        except Exception:
+            pass
 
     # ------------------------------------------------------------------
     # Hybrid search  (kNN + BM25)
@@ -224,45 +423,168 @@ class ElasticClient:
         query_text: str,
         filters: Optional[Dict[str, Any]] = None,
         top_k: int = 10,
-        knn_boost: float = 0.7,
-        bm25_boost: float = 0.3,
+        rank_window_size: int = RRF_RANK_WINDOW_SIZE,
+        rank_constant: int = RRF_RANK_CONSTANT,
     ) -> List[Dict[str, Any]]:
         """
         Hybrid search combining:
           1. kNN vector similarity (JINA embedding)
           2. BM25 text match on title + description + domain_knowledge
 
+        The two result lists are fused server-side with Reciprocal Rank
+        Fusion (Elastic ``rrf`` retriever), so hits come back already ranked.
+
         Returns ranked list of workflow hits.
         """
+        if self.inference_id:
+            # Query embedded server-side; no vector, so no semantic cache
+            body = self._hybrid_body(
+                query_text, None, filters, top_k, rank_window_size, rank_constant
+            )
+            resp = self.es.search(index=self.index_name, body=body)
+            return self._rank_hits(resp, rank_constant)
+
         # Build query embedding
         query_embedding = self.embedder.embed_query(query_text)
 
+        scope = SemanticQueryCache.scope(filters, top_k)
+        cached = self.query_cache.get(query_embedding, scope)
+        if cached is not None:
+            return cached
+
+        body = self._hybrid_body(
+            query_text, query_embedding, filters, top_k, rank_window_size, rank_constant
+        )
+        resp = self.es.search(index=self.index_name, body=body)
+        results = self._rank_hits(resp, rank_constant)
+        self.query_cache.put(query_embedding, scope, results)
+        return results
+
+    def hybrid_search_many(
+        self,
+        searches: List[Tuple[str, Optional[Dict[str, Any]], int]],
+        rank_window_size: int = RRF_RANK_WINDOW_SIZE,
+        rank_constant: int = RRF_RANK_CONSTANT,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several hybrid searches with one JINA call and one ``_msearch``.
+
+        searches: list of (query_text, filters, top_k).
+        Returns one ranked hit list per search, in order.
+        """
+        if not searches:
+            return []
+
+        if self.inference_id:
+            lines: List[Dict[str, Any]] = []
+            for text, filters, top_k in searches:
+                lines.append({"index": self.index_name})
+                lines.append(self._hybrid_body(
+                    text, None, filters, top_k, rank_window_size, rank_constant
+                ))
+            resp = self.es.msearch(body=lines)
+            ranked = []
+            for item in resp["responses"]:
+                if "error" in item:
+                    raise RuntimeError(f"msearch item failed: {item['error']}")
+                ranked.append(self._rank_hits(item, rank_constant))
+            return ranked
+
+        embeddings = self.embedder.embed_queries([text for text, _, _ in searches])
+
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(searches)
+        pending = []
+        lines = []
+        for i, ((text, filters, top_k), embedding) in enumerate(zip(searches, embeddings)):
+            scope = SemanticQueryCache.scope(filters, top_k)
+            results[i] = self.query_cache.get(embedding, scope)
+            if results[i] is not None:
+                continue
+            pending.append((i, embedding, scope))
+            lines.append({"index": self.index_name})
+            lines.append(self._hybrid_body(
+                text, embedding, filters, top_k, rank_window_size, rank_constant
+            ))
+
+        if lines:
+            resp = self.es.msearch(body=lines)
+            for (i, embedding, scope), item in zip(pending, resp["responses"]):
+                if "error" in item:
+                    raise RuntimeError(f"msearch item failed: {item['error']}")
+                results[i] = self._rank_hits(item, rank_constant)
+                self.query_cache.put(embedding, scope, results[i])
+        return results
+
+    def more_like_this(self, workflow_id: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """
+        kNN search seeded by a stored workflow's own embedding.
+
+        Elastic resolves the vector server-side via query_vector_builder.lookup,
+        so there is no JINA call and no fetch-then-search round trip.
+        """
+        body = {
+            "size": top_k,
+            "knn": {
+                "field": "embedding",
+                "k": top_k + 1,
+                "num_candidates": max((top_k + 1) * 5, RRF_KNN_NUM_CANDIDATES),
+                "query_vector_builder": {
+                    "lookup": {"index": self.index_name, "id": workflow_id, "path": "embedding"},
+                },
+                "filter": {"bool": {"must_not": [{"ids": {"values": [workflow_id]}}]}},
+            },
+            "_source": SOURCE_WITHOUT_EMBEDDING,
+        }
+        resp = self.es.search(index=self.index_name, body=body)
+
+        results = []
+        for hit in resp["hits"]["hits"]:
+            doc = hit["_source"]
+            doc["_score"] = hit["_score"]
+            # dot_product kNN scores on unit vectors are (1 + cos) / 2; report cos
+            doc["match_percentage"] = min(100, max(0, int((2 * hit["_score"] - 1) * 100)))
+            results.append(doc)
+        return results
+
+    def _hybrid_body(
+        self,
+        query_text: str,
+        query_embedding: Optional[List[float]],
+        filters: Optional[Dict[str, Any]],
+        top_k: int,
+        rank_window_size: int,
+        rank_constant: int,
+    ) -> Dict[str, Any]:
         # Build filter clause
-        filter_clauses = []
-        if filters:
-            for field in ("task_type", "state", "year", "location", "platform", "domain"):
-                if field in filters and filters[field] is not None:
-                    filter_clauses.append({"term": {field: filters[field]}})
-
-        # kNN clause
-        knn = {
+        filters = filters or {}
+        filter_clauses = [
+            {"term": {field: filters[field]}}
+            for field in HYBRID_FILTER_FIELDS
+            if filters.get(field) is not None
+        ]
+
+        # kNN retriever; without a vector Elastic embeds the text itself
+        knn: Dict[str, Any] = {
             "field": "embedding",
-            "query_vector": query_embedding,
-            "k": top_k,
-            "num_candidates": max(top_k * 5, 50),
-            "boost": knn_boost,
+            "k": max(top_k, RRF_KNN_K),
+            "num_candidates": max(top_k * 5, RRF_KNN_NUM_CANDIDATES),
         }
+        if query_embedding is None:
+            knn["query_vector_builder"] = {
+                "text_embedding": {"model_id": self.inference_id, "model_text": query_text},
+            }
+        else:
+            knn["query_vector"] = query_embedding
         if filter_clauses:
             knn["filter"] = {"bool": {"must": filter_clauses}}
 
-        # BM25 clause
+        # BM25 retriever
         bm25_query: Dict[str, Any] = {
             "bool": {
                 "should": [
                     {"multi_match": {
                         "query": query_text,
-                        "fields": ["title^3", "description^2", "domain_knowledge", "tags^2"],
-                        "boost": bm25_boost,
+                        "fields": HYBRID_BM25_FIELDS,
                     }},
                 ],
             },
@@ -270,24 +592,55 @@ class ElasticClient:
         if filter_clauses:
             bm25_query["bool"]["filter"] = filter_clauses
 
-        body = {
+        return {
             "size": top_k,
-            "knn": knn,
-            "query": bm25_query,
-            "_source": {"excludes": ["embedding"]},
+            "retriever": {
+                "rrf": {
+                    "retrievers": [
+                        {"standard": {"query": bm25_query}},
+                        {"knn": knn},
+                    ],
+                    "rank_window_size": max(top_k, rank_window_size),
+                    "rank_constant": rank_constant,
+                },
+            },
+            "_source": SOURCE_WITHOUT_EMBEDDING,
         }
 
-        resp = self.es.search(index=self.index_name, body=body)
+    @staticmethod
+    def _rank_hits(resp: Dict[str, Any], rank_constant: int) -> List[Dict[str, Any]]:
+        # Best possible RRF score: rank 1 in both retrievers
+        max_score = 2.0 / (rank_constant + 1)
+
+        hits = resp["hits"]["hits"]
+        scores = np.array([hit["_score"] for hit in hits], dtype=np.float64)
+        percentages = np.minimum(100, (scores / max_score * 100).astype(np.int64))  # normalise
 
         results = []
-        for hit in resp["hits"]["hits"]:
+        for hit, pct in zip(hits, percentages.tolist()):
             doc = hit["_source"]
             doc["_score"] = hit["_score"]
-            doc["match_percentage"] = min(100, int(hit["_score"] * 50))  # normalise
+            doc["match_percentage"] = pct
             results.append(doc)
-
         return results
 
+    def warmup(self):
+        """
+        Run a throwaway kNN query so HNSW graph pages are cached before the
+        first user search. Best-effort; errors are only logged.
+        """
+        probe = [0.0] * self.embedder.dimension
+        probe[0] = 1.0  # dot_product needs a unit-length query vector
+        try:
+            self.es.search(
+                index=self.index_name,
+                knn={"field": "embedding", "query_vector": probe, "k": 10, "num_candidates": 100},
+                size=0,
+            )
+            print(f"[elastic] warmed index '{self.index_name}'")
+        except Exception as e:
+            print(f"[elastic] warmup skipped ({e})")
+
     # ------------------------------------------------------------------
     # Convenience helpers
     # ------------------------------------------------------------------
@@ -302,21 +655,67 @@ class ElasticClient:
         except Exception:
             return None
 
-    def update_field(self, workflow_id: str, field: str, value: Any):
-        """Partial update of a single field."""
+    def update_field(self, workflow_id: str, field: str, value: Any, refresh: Union[bool, str] = False):
+        """
+        Partial update of a single field.
+        Pass refresh="wait_for" to return only once searches see the value;
+        the default doesn't block on the index refresh.
+        """
         self.es.update(
             index=self.index_name,
             id=workflow_id,
             body={"doc": {field: value}},
+            refresh=refresh,
         )
+        self.query_cache.clear()
 
-    def get_all(self, size: int = 100) -> List[Dict[str, Any]]:
-        """Return all workflows (for listing page)."""
-        resp = self.es.search(
-            index=self.index_name,
-            body={"size": size, "query": {"match_all": {}}, "_source": {"excludes": ["embedding"]}},
-        )
-        return [hit["_source"] for hit in resp["hits"]["hits"]]
+    def update_fields(self, docs: Dict[str, Dict[str, Any]]) -> List[str]:
+        """
+        Partial update of several workflows in one _bulk request.
+        Returns the IDs whose update failed with a retryable status (429/5xx).
+        """
+        operations: List[Dict[str, Any]] = []
+        for workflow_id, doc in docs.items():
+            operations.append({"update": {"_index": self.index_name, "_id": workflow_id}})
+            operations.append({"doc": doc})
+        # wait_for: searches after this returns see the new values
+        resp = self.es.bulk(operations=operations, refresh="wait_for")
+        self.query_cache.clear()
+        retry: List[str] = []
+        if resp.get("errors"):
+            failed = [i["update"] for i in resp["items"] if i["update"].get("error")]
+            print(f"[elastic] bulk update failed for {[item['_id'] for item in failed]}")
+            retry = [item["_id"] for item in failed if item.get("status") == 429 or item.get("status", 0) >= 500]
+        return retry
+
+    def get_all(self, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Return all workflows (for listing page).
+        Pages through a point-in-time with search_after so large indexes are
+        not silently truncated at a single search's size.
+        """
+        pit_id = self.es.open_point_in_time(index=self.index_name, keep_alive="1m")["id"]
+        workflows: List[Dict[str, Any]] = []
+        search_after = None
+        try:
+            while True:
+                resp = self.es.search(
+                    size=page_size,
+                    query={"match_all": {}},
+                    pit={"id": pit_id, "keep_alive": "1m"},
+                    sort=[{"workflow_id": "asc"}],
+                    search_after=search_after,
+                    source_excludes=["embedding"],
+                )
+                hits = resp["hits"]["hits"]
+                workflows.extend(hit["_source"] for hit in hits)
+                if len(hits) < page_size:
+                    break
+                pit_id = resp.get("pit_id", pit_id)
+                search_after = hits[-1]["sort"]
+        finally:
+            self.es.close_point_in_time(id=pit_id)
+        return workflows
 
     def count(self) -> int:
         return self.es.count(index=self.index_name)["count"]
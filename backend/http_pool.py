@@ -0,0 +1,64 @@
+"""
+Shared keep-alive HTTP clients for outbound API calls.
+
+One requests.Session (JINA embeddings) and one httpx client (Anthropic) per
+process, so repeated calls reuse pooled TLS connections instead of paying a
+handshake each time. Elasticsearch clients pool internally; see
+ES_CONNECTIONS_PER_NODE.
+"""
+
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_MAXSIZE = 100
+ES_CONNECTIONS_PER_NODE = 100
+# Transient upstream failures are retried with backoff on the shared session;
+# embedding POSTs are idempotent, so they are retried too.
+HTTP_RETRY = Retry(
+    total=3,
+    backoff_factor=0.2,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "POST"}),
+)
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_anthropic_http = None
+
+
+def get_session() -> requests.Session:
+    """Process-wide requests.Session with a POOL_MAXSIZE keep-alive pool and HTTP_RETRY."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=10, pool_maxsize=POOL_MAXSIZE, max_retries=HTTP_RETRY
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_anthropic_http_client():
+    """Process-wide httpx client for Anthropic SDK instances."""
+    global _anthropic_http
+    if _anthropic_http is None:
+        with _lock:
+            if _anthropic_http is None:
+                import httpx
+                from anthropic import DefaultHttpxClient
+
+                _anthropic_http = DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=POOL_MAXSIZE,
+                        max_keepalive_connections=POOL_MAXSIZE,
+                    ),
+                )
+    return _anthropic_http
@@ -10,20 +10,51 @@ Elastic Cloud / JINA keys are missing.
 """
 
 import os
-import json
+import mmap
+import hashlib
+from collections import defaultdict
 import numpy as np
+import orjson
 from typing import List, Dict, Any, Optional
 
 
+# Hard filters: a workflow must match task_type; state / year only apply to
+# workflows that carry the field
+FILTER_FIELDS = ("task_type", "state", "year")
+OPTIONAL_FILTER_FIELDS = ("state", "year")
+# Query fields forwarded to Elastic as term filters
+ELASTIC_FILTER_FIELDS = ("task_type", "state", "year", "location", "platform", "domain")
+
+# Fallback-mode catalog embeddings are cached next to the workflows file as
+# embeddings_<hash>.npy and memory-mapped on later loads
+EMBEDDING_CACHE_PREFIX = "embeddings_"
+
+# Catalogs above this size are parsed straight from a read-only mmap
+MMAP_THRESHOLD = 10 * 1024 * 1024  # bytes
+
+
 class WorkflowMatcher:
     """
     Matches user queries to workflows.
     Delegates to ElasticClient when available, else uses in-memory fallback.
+    The fallback ranks by cosine over JINA embeddings when an embedder is
+    given, and by token Jaccard otherwise.
     """
 
-    def __init__(self, elastic_client=None):
+    def __init__(self, elastic_client=None, embedder=None):
         self.elastic = elastic_client
+        self.embedder = embedder
         self.workflows: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._tokens: Dict[str, frozenset] = {}
+        # Inverted index over self.workflows rows for vectorized Jaccard scoring
+        self._postings: Dict[str, np.ndarray] = {}
+        self._token_counts = np.zeros(0, dtype=np.int64)
+        # field -> value -> rows, plus rows exempt from optional filters
+        self._filter_index: Dict[str, Dict[Any, np.ndarray]] = {}
+        self._filter_exempt: Dict[str, np.ndarray] = {}
+        # JINA embeddings L2-normalized at load, one row per workflow (fallback mode only)
+        self._embeddings: Optional[np.ndarray] = None
         self._use_elastic = elastic_client is not None
         print(f"[matcher] mode={'elastic' if self._use_elastic else 'in-memory'}")
 
@@ -33,11 +64,80 @@ class WorkflowMatcher:
 
     def load_workflows(self, workflows_path: str):
         """Load workflows from JSON file."""
-        with open(workflows_path, "r") as f:
-            data = json.load(f)
+        with open(workflows_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    data = orjson.loads(view)
+            else:
+                data = orjson.loads(f.read())
             self.workflows = data["workflows"]
+        # id -> workflow; first occurrence wins, as with the old linear scan
+        self._by_id = {wf["workflow_id"]: wf for wf in reversed(self.workflows)}
+        # Token sets for the in-memory Jaccard search, built once per load
+        self._tokens = {
+            wf_id: frozenset(self._workflow_to_text(wf).lower().split())
+            for wf_id, wf in self._by_id.items()
+        }
+        postings: Dict[str, List[int]] = defaultdict(list)
+        counts = []
+        for row, wf in enumerate(self.workflows):
+            tokens = self._workflow_tokens(wf)
+            counts.append(len(tokens))
+            for token in tokens:
+                postings[token].append(row)
+        self._postings = {token: np.array(rows, dtype=np.int64) for token, rows in postings.items()}
+        self._token_counts = np.array(counts, dtype=np.int64)
+
+        by_value: Dict[str, Dict[Any, List[int]]] = {f: defaultdict(list) for f in FILTER_FIELDS}
+        exempt: Dict[str, List[int]] = {f: [] for f in OPTIONAL_FILTER_FIELDS}
+        for row, wf in enumerate(self.workflows):
+            by_value["task_type"][wf.get("task_type")].append(row)
+            for field in OPTIONAL_FILTER_FIELDS:
+                if field in wf:
+                    by_value[field][wf[field]].append(row)
+                else:
+                    exempt[field].append(row)
+        self._filter_index = {
+            field: {value: np.array(rows, dtype=np.int64) for value, rows in values.items()}
+            for field, values in by_value.items()
+        }
+        self._filter_exempt = {field: np.array(rows, dtype=np.int64) for field, rows in exempt.items()}
+
+        self._embeddings = None
+        if self.embedder is not None and not self._use_elastic:
+            try:
+                self._embeddings = self._load_embeddings(os.path.dirname(workflows_path))
+            except Exception as e:
+                print(f"[matcher] JINA embedding failed ({e}) — using token matching")
         print(f"[matcher] loaded {len(self.workflows)} workflows from disk")
 
+    def _load_embeddings(self, cache_dir: str) -> np.ndarray:
+        """
+        L2-normalized catalog embeddings. Read-only mmap of a cached .npy when
+        one matches the catalog text and model, else embedded and cached.
+        """
+        texts = [self._workflow_to_text(wf) for wf in self.workflows]
+        digest = hashlib.sha256(str(getattr(self.embedder, "model", "")).encode())
+        for text in texts:
+            digest.update(text.encode())
+            digest.update(b"\0")
+        path = os.path.join(cache_dir, f"{EMBEDDING_CACHE_PREFIX}{digest.hexdigest()[:16]}.npy")
+        if os.path.exists(path):
+            return np.load(path, mmap_mode="r")
+
+        embeddings = np.asarray(self.embedder.embed_documents(texts), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embeddings = np.ascontiguousarray(embeddings / norms)
+        try:
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, embeddings)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[matcher] could not cache embeddings ({e})")
+        return embeddings
+
     # ------------------------------------------------------------------
     # Search
     # ------------------------------------------------------------------
@@ -47,62 +147,178 @@ class WorkflowMatcher:
         Search for matching workflows.
         Uses Elasticsearch hybrid search when available, otherwise in-memory.
         """
+        if query.get("like_workflow_id"):
+            return self.recommend(query["like_workflow_id"], top_k) or []
         if self._use_elastic:
             return self._elastic_search(query, top_k)
         return self._memory_search(query, top_k)
 
+    def recommend(self, workflow_id: str, top_k: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """
+        Workflows similar to an existing one ("more like this"), or None
+        when the workflow doesn't exist.
+        Elastic mode reuses the stored embedding server-side in the same
+        search (no JINA call, no separate lookup of the workflow).
+        """
+        if self._use_elastic:
+            from elasticsearch import BadRequestError, NotFoundError
+
+            try:
+                return self.elastic.more_like_this(workflow_id, top_k)
+            except (NotFoundError, BadRequestError):
+                # query_vector_builder.lookup found no such document
+                return None
+
+        source = self._by_id.get(workflow_id)
+        if not source:
+            return None
+        rows = np.array(
+            [row for row, wf in enumerate(self.workflows) if wf["workflow_id"] != workflow_id],
+            dtype=np.int64,
+        )
+        if not len(rows):
+            return []
+        scores = self._jaccard_scores(self._workflow_tokens(source), rows)
+        return self._top_results(rows, scores, top_k, boost=120)
+
+    def search_many(
+        self, queries: List[Dict[str, Any]], top_k: int = 10
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries at once.
+        In Elastic mode this is one JINA call and one _msearch round trip;
+        in-memory embedding mode embeds all queries in one JINA call.
+        """
+        if any(q.get("like_workflow_id") for q in queries):
+            return [self.search(q, top_k) for q in queries]
+        if self._use_elastic:
+            return self.elastic.hybrid_search_many([
+                (self._query_to_text(q), self._elastic_filters(q), top_k) for q in queries
+            ])
+        vectors: List[Optional[List[float]]] = [None] * len(queries)
+        if self._embeddings is not None:
+            try:
+                vectors = self.embedder.embed_queries([self._query_to_text(q) for q in queries])
+            except Exception as e:
+                print(f"[matcher] JINA query embedding failed ({e}) — using token matching")
+                return [self._memory_search(q, top_k, use_embeddings=False) for q in queries]
+        return [self._memory_search(q, top_k, v) for q, v in zip(queries, vectors)]
+
     # -- Elasticsearch path --
 
     def _elastic_search(self, query: Dict[str, Any], top_k: int) -> List[Dict[str, Any]]:
         query_text = self._query_to_text(query)
-        filters = {}
-        for f in ("task_type", "state", "year", "location", "platform", "domain"):
-            if f in query:
-                filters[f] = query[f]
+        filters = self._elastic_filters(query)
         return self.elastic.hybrid_search(query_text, filters=filters, top_k=top_k)
 
+    @staticmethod
+    def _elastic_filters(query: Dict[str, Any]) -> Dict[str, Any]:
+        return {f: query[f] for f in ELASTIC_FILTER_FIELDS if f in query}
+
     # -- In-memory fallback (no Elastic / JINA needed) --
 
-    def _memory_search(self, query: Dict[str, Any], top_k: int) -> List[Dict[str, Any]]:
-        candidates = self._apply_hard_filters(query)
-        if not candidates:
+    def _memory_search(
+        self,
+        query: Dict[str, Any],
+        top_k: int,
+        query_vector: Optional[List[float]] = None,
+        use_embeddings: bool = True,
+    ) -> List[Dict[str, Any]]:
+        rows = self._candidate_rows(query)
+        if not len(rows):
             return []
 
+        scores = self._semantic_scores(query, rows, query_vector) if use_embeddings else None
+        if scores is not None:
+            # dot product of unit vectors = cosine
+            return self._top_results(rows, scores, top_k, boost=100)
+
         query_text = self._query_to_text(query).lower()
-        query_tokens = set(query_text.split())
+        scores = self._jaccard_scores(frozenset(query_text.split()), rows)
+        return self._top_results(rows, scores, top_k, boost=120)  # slight boost
+
+    def _jaccard_scores(self, tokens: frozenset, rows: np.ndarray) -> np.ndarray:
+        """
+        Jaccard similarity of tokens against every row at once: overlap counts
+        come from the tokens' posting lists, |union| = |q| + |w| - overlap.
+        """
+        hits = [self._postings[t] for t in tokens if t in self._postings]
+        if hits:
+            overlap = np.bincount(np.concatenate(hits), minlength=len(self.workflows))[rows]
+        else:
+            overlap = np.zeros(len(rows), dtype=np.int64)
+        union = self._token_counts[rows] + len(tokens) - overlap
+        return overlap / np.maximum(union, 1)
 
+    def _semantic_scores(
+        self, query: Dict[str, Any], rows: np.ndarray, vector: Optional[List[float]] = None
+    ) -> Optional[np.ndarray]:
+        """Cosine scores for rows, or None when embeddings are unavailable."""
+        if self._embeddings is None:
+            return None
+        if vector is None:
+            try:
+                vector = self.embedder.embed_query(self._query_to_text(query))
+            except Exception as e:
+                print(f"[matcher] JINA query embedding failed ({e}) — using token matching")
+                return None
+        query_vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm:
+            query_vector /= norm
+        # rows is sorted and unique, so full length means every row: skip the gather copy
+        if len(rows) == len(self._embeddings):
+            return self._embeddings @ query_vector
+        return self._embeddings[rows] @ query_vector
+
+    def _top_results(
+        self, rows: np.ndarray, scores: np.ndarray, top_k: int, boost: int
+    ) -> List[Dict[str, Any]]:
+        if 0 < top_k < len(scores):
+            # Partial selection, then a stable sort of just the rows at or above
+            # the k-th best score, so ties keep catalog order as a full sort would
+            kth = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+            shortlist = np.flatnonzero(scores >= kth)
+            top = shortlist[np.argsort(-scores[shortlist], kind="stable")][:top_k]
+        else:
+            top = np.argsort(-scores, kind="stable")[:top_k]
+        percentages = np.clip((scores[top] * boost).astype(np.int64), 0, 100)
         results = []
-        for wf in candidates:
-            wf_text = self._workflow_to_text(wf).lower()
-            wf_tokens = set(wf_text.split())
-            # Jaccard-ish similarity
-            intersection = query_tokens & wf_tokens
-            union = query_tokens | wf_tokens
-            score = len(intersection) / max(len(union), 1)
-
-            result = {k: v for k, v in wf.items()}
-            result["similarity_score"] = round(score, 4)
-            result["match_percentage"] = min(100, int(score * 120))  # slight boost
+        for i, pct in zip(top.tolist(), percentages.tolist()):
+            result = dict(self.workflows[rows[i]])
+            result["similarity_score"] = round(float(scores[i]), 4)
+            result["match_percentage"] = pct
             results.append(result)
-
-        results.sort(key=lambda x: x["similarity_score"], reverse=True)
-        return results[:top_k]
+        return results
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
-    def _apply_hard_filters(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
-        candidates = []
-        for wf in self.workflows:
-            if "task_type" in query and wf.get("task_type") != query["task_type"]:
-                continue
-            if "state" in query and "state" in wf and wf["state"] != query["state"]:
-                continue
-            if "year" in query and "year" in wf and wf["year"] != query["year"]:
+    def _candidate_rows(self, query: Dict[str, Any]) -> np.ndarray:
+        """Indices into self.workflows that pass the query's hard filters (sorted)."""
+        rows = None
+        for field in FILTER_FIELDS:
+            if field not in query:
                 continue
-            candidates.append(wf)
-        return candidates
+            try:
+                matched = self._filter_index[field].get(query[field])
+            except TypeError:  # unhashable query value never equals a catalog value
+                matched = None
+            if matched is None:
+                matched = np.zeros(0, dtype=np.int64)
+            if field in self._filter_exempt:
+                matched = np.union1d(matched, self._filter_exempt[field])
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+        if rows is None:
+            return np.arange(len(self.workflows))
+        return rows
+
+    def _workflow_tokens(self, wf: Dict[str, Any]) -> frozenset:
+        tokens = self._tokens.get(wf.get("workflow_id"))
+        if tokens is None:
+            tokens = frozenset(self._workflow_to_text(wf).lower().split())
+        return tokens
 
     def _workflow_to_text(self, wf: Dict[str, Any]) -> str:
         parts = [
@@ -116,10 +332,8 @@ class WorkflowMatcher:
         return " | ".join(parts)
 
     def _query_to_text(self, query: Dict[str, Any]) -> str:
-        parts = []
-        for key, value in query.items():
-            parts.append(f"{key}: {value}")
-        return " | ".join(parts)
+        # Keys sorted so equal queries give identical text (and embedding cache hits)
+        return " | ".join(f"{key}: {value}" for key, value in sorted(query.items()))
 
     def get_workflow_by_id(self, workflow_id: str) -> Optional[Dict[str, Any]]:
         # Try Elastic first
@@ -128,10 +342,7 @@ class WorkflowMatcher:
             if wf:
                 return wf
         # Fallback to in-memory
-        for wf in self.workflows:
-            if wf["workflow_id"] == workflow_id:
-                return wf
-        return None
+        return self._by_id.get(workflow_id)
 
     def get_all_workflows(self) -> List[Dict[str, Any]]:
         if self._use_elastic:
@@ -10,11 +10,17 @@ PRICING SEMANTICS (FIXED):
 - total_cost: download_cost + execution_cost (properly deduplicated)
 """
 
+import sys
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass, field
 
 
-@dataclass
+def _intern(value: Any) -> Any:
+    """Intern categorical strings so equal values share one object."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
 class Subtask:
     """
     A subtask from query decomposition.
@@ -46,7 +52,7 @@ class Subtask:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class TokenComparison:
     """Token usage comparison: with workflow vs from scratch."""
     with_workflow: int
@@ -68,7 +74,7 @@ class TokenComparison:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Workflow:
     """
     A reusable workflow template from the marketplace.
@@ -112,6 +118,25 @@ class Workflow:
     examples: List[Dict[str, Any]] = field(default_factory=list)
     token_comparison: Optional[TokenComparison] = None
 
+    # Derived at construction (see __post_init__)
+    from_scratch_cost: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.task_type = _intern(self.task_type)
+        self.node_type = _intern(self.node_type)
+        self.state = _intern(self.state)
+        if self.tags:
+            self.tags = [_intern(tag) for tag in self.tags]
+
+        # Estimated tokens to solve this task without the marketplace: the
+        # token_comparison figure when present, else 3-5x the workflow cost
+        # (more steps, higher multiplier)
+        if self.token_comparison and self.token_comparison.from_scratch > 0:
+            self.from_scratch_cost = self.token_comparison.from_scratch
+        else:
+            multiplier = 3 + min(2, len(self.steps or ()) / 10)
+            self.from_scratch_cost = int(self.total_cost * multiplier)
+
     @property
     def total_cost(self) -> int:
         """
@@ -282,7 +307,7 @@ class Workflow:
         return doc
 
 
-@dataclass
+@dataclass(slots=True)
 class SubtaskNode:
     """
     A node in the execution DAG representing a subtask with its assigned workflow.
@@ -347,7 +372,7 @@ class SubtaskNode:
         return self.execution_cost
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionDAG:
     """
     Execution DAG representing a complete solution.
@@ -383,10 +408,14 @@ class ExecutionDAG:
         - pricing: Properly calculated costs
         - metadata: Coverage, confidence, etc.
         """
-        # Serialize nodes with full workflow data
+        # Serialize nodes with full workflow data and recalculate pricing in
+        # the same pass: download cost once per unique workflow (first node
+        # wins), execution cost per node
         nodes_list = []
+        download_costs: Dict[str, int] = {}
+        recalc_execution_cost = 0
         for node in self.nodes.values():
-            node_dict = {
+            nodes_list.append({
                 "id": node.id,
                 "description": node.description,
                 "workflow": node.workflow.to_dict(),
@@ -394,22 +423,10 @@ class ExecutionDAG:
                 "children": node.children,
                 "weight": node.weight,
                 "confidence_score": node.confidence_score
-            }
-            nodes_list.append(node_dict)
-
-        # Recalculate pricing with proper deduplication
-        unique_workflow_ids = set()
-        recalc_download_cost = 0
-        recalc_execution_cost = 0
-
-        for node in self.nodes.values():
-            # Download cost: charge once per unique workflow
-            if node.workflow_id not in unique_workflow_ids:
-                unique_workflow_ids.add(node.workflow_id)
-                recalc_download_cost += node.download_cost
-
-            # Execution cost: charge per node
+            })
+            download_costs.setdefault(node.workflow_id, node.download_cost)
             recalc_execution_cost += node.execution_cost
+        recalc_download_cost = sum(download_costs.values())
 
         return {
             "nodes": nodes_list,
@@ -424,12 +441,12 @@ class ExecutionDAG:
                 "coverage": self.coverage,
                 "overall_confidence": self.overall_confidence,
                 "num_nodes": len(self.nodes),
-                "num_unique_workflows": len(unique_workflow_ids)
+                "num_unique_workflows": len(download_costs)
             }
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkflowNodeDoc:
     """
     A single node (subtask/step) within a workflow, indexed separately.
@@ -448,6 +465,9 @@ class WorkflowNodeDoc:
     embedding: Optional[List[float]] = None
     score: float = 0.0
 
+    def __post_init__(self):
+        self.node_type = _intern(self.node_type)
+
     @classmethod
     def from_es_hit(cls, hit: Dict[str, Any]) -> "WorkflowNodeDoc":
         """Create WorkflowNodeDoc from Elasticsearch hit."""
@@ -488,7 +508,7 @@ class WorkflowNodeDoc:
         return doc
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     """
     A single search result from Elasticsearch.
@@ -500,7 +520,7 @@ class SearchResult:
     source: str = "direct"  # "direct" or "composite"
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchPlan:
     """
     A search plan from the decomposer.
@@ -407,28 +407,10 @@ class MarketplaceOrchestrator:
         """
         Estimate cost to solve from scratch without marketplace.
 
-        Uses workflow metadata if available, otherwise uses heuristic.
+        Uses workflow metadata if available, otherwise uses heuristic
+        (precomputed per workflow as Workflow.from_scratch_cost).
         """
-        total_from_scratch = 0
-
-        for node in dag.nodes.values():
-            workflow = node.workflow  # ✅ It's a Workflow object now!
-
-            # Check if workflow has token_comparison metadata
-            if workflow and workflow.token_comparison:
-                from_scratch_tokens = workflow.token_comparison.from_scratch
-                if from_scratch_tokens > 0:
-                    total_from_scratch += from_scratch_tokens
-                    continue
-
-            # Fallback heuristic: 3-5x the workflow cost based on complexity
-            # More complex workflows (more steps) have higher multiplier
-            num_steps = len(workflow.steps) if workflow else 10
-            multiplier = 3 + min(2, num_steps / 10)  # 3x to 5x based on steps
-            total_from_scratch += int(node.total_cost * multiplier)
-
-        return total_from_scratch
-
+        return sum(node.workflow.from_scratch_cost for node in dag.nodes.values())
 
 # Example usage
 if __name__ == "__main__":
@@ -445,6 +427,7 @@ if __name__ == "__main__":
     print("\nLoading workflows...")
     orchestrator.decomposer.es_service.create_index(delete_existing=True)
     orchestrator.decomposer.load_and_index_workflows("workflows.json")
+    orchestrator.decomposer.es_service.force_merge()
 
     # Example 1: Estimate price and search
     print("\n" + "="*70)
@@ -3,9 +3,11 @@ Dynamic Pricing Engine for Agent Workflow Marketplace.
 Calculates workflow prices based on value delivered and quality.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
 import statistics
 
+import numpy as np
+
 
 class PricingEngine:
     """
@@ -134,6 +136,45 @@ class PricingEngine:
             'breakdown': breakdown
         }
 
+    @staticmethod
+    def calculate_workflow_prices(
+        avg_tokens_without: Sequence[int],
+        avg_tokens_with: Sequence[int],
+        ratings: Sequence[float]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_workflow_price for many workflows at once.
+
+        Applies the same formulas element-wise (no market constraint) and
+        returns one array per field:
+        {
+            'tokens_saved': int64,
+            'base_amount': int64,
+            'base_price': int64,
+            'quality_multiplier': float64,
+            'final_price': int64
+        }
+        """
+        without = np.asarray(avg_tokens_without, dtype=np.int64)
+        with_ = np.asarray(avg_tokens_with, dtype=np.int64)
+        rating = np.asarray(ratings, dtype=np.float64)
+
+        tokens_saved = without - with_
+        quality_multiplier = 0.7 + (rating / 5.0) * 0.6
+        base_amount = (tokens_saved * PricingEngine.BASE_PERCENTAGE).astype(np.int64)
+        base_price = np.rint(
+            tokens_saved * PricingEngine.BASE_PERCENTAGE * quality_multiplier
+        ).astype(np.int64)
+        final_price = np.clip(base_price, PricingEngine.MIN_PRICE, PricingEngine.MAX_PRICE)
+
+        return {
+            'tokens_saved': tokens_saved,
+            'base_amount': base_amount,
+            'base_price': base_price,
+            'quality_multiplier': quality_multiplier,
+            'final_price': final_price
+        }
+
     @staticmethod
     def get_comparable_workflows(
         all_workflows: List[Dict],
@@ -9,6 +9,8 @@ Uses unified models from models.py - NO DICTS!
 
 from typing import List, Dict, Optional
 
+import numpy as np
+
 from models import Workflow, SubtaskNode, ExecutionDAG, Subtask, SearchPlan
 
 
@@ -328,33 +330,38 @@ class WorkflowRecomposer:
             embedding_service = get_embedding_service()
 
         matched_triples = []
+        if not workflows:
+            for subtask_idx, subtask in enumerate(subtasks):
+                print(f"  Warning: No workflow found for subtask [{subtask_idx}] '{subtask.text}'")
+            return matched_triples
+        if not subtasks:
+            return matched_triples
+
+        # Embed all subtasks in one API call
+        subtask_embeddings = embedding_service.embed([subtask.text for subtask in subtasks])
+
+        # Stack workflow embeddings once; workflows without one keep their search score
+        base_scores = np.array([wf.similarity_score for wf in workflows], dtype=np.float64)
+        with_embedding = [i for i, wf in enumerate(workflows) if wf.embedding]
+        embedding_matrix = (
+            np.asarray([workflows[i].embedding for i in with_embedding], dtype=np.float32)
+            if with_embedding else None
+        )
+        task_types = [wf.task_type for wf in workflows]
+
+        for subtask_idx, (subtask, subtask_embedding) in enumerate(zip(subtasks, subtask_embeddings)):
+            scores = base_scores.copy()
+            if embedding_matrix is not None:
+                scores[with_embedding] = embedding_service.cosine_similarities(
+                    subtask_embedding, embedding_matrix
+                )
+
+            # Boost if task types match
+            scores[[t == subtask.task_type for t in task_types]] *= 1.2
 
-        for subtask_idx, subtask in enumerate(subtasks):
-            best_workflow = None
-            best_score = -1
-
-            # Generate embedding for subtask
-            subtask_embedding = embedding_service.embed(subtask.text)
-
-            for workflow in workflows:
-                # Use embedding similarity if available
-                if workflow.embedding:
-                    similarity = embedding_service.cosine_similarity(
-                        subtask_embedding,
-                        workflow.embedding
-                    )
-                    score = similarity
-                else:
-                    # Fallback: use existing similarity score
-                    score = workflow.similarity_score
-
-                # Boost if task types match
-                if workflow.task_type == subtask.task_type:
-                    score *= 1.2
-
-                if score > best_score:
-                    best_score = score
-                    best_workflow = workflow
+            best_idx = int(np.argmax(scores))
+            best_score = scores[best_idx]
+            best_workflow = workflows[best_idx] if best_score > -1 else None
 
             if best_workflow:
                 matched_triples.append((subtask_idx, subtask, best_workflow))
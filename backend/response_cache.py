@@ -0,0 +1,128 @@
+"""
+Response cache for read-only GET endpoints.
+
+Stores serialized JSON bodies keyed by endpoint + request key. Uses Redis
+when REDIS_URL is set (shared across workers), otherwise a process-local
+TTL + LRU dict. Writers invalidate either a single key or a whole endpoint.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import current_app
+
+
+class ResponseCache:
+    """TTL cache for Flask JSON responses with per-endpoint invalidation."""
+
+    def __init__(self, redis_url: Optional[str] = None, prefix: str = "v1", max_entries: int = 4096):
+        self.prefix = prefix
+        self.max_entries = max_entries
+        self._redis = None
+        # Least recently used first; trimmed to max_entries on every set
+        self._local: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if redis_url:
+            try:
+                import redis
+
+                self._redis = redis.Redis.from_url(redis_url)
+                self._redis.ping()
+                print(f"[cache] Redis response cache at {redis_url}")
+            except Exception as e:
+                self._redis = None
+                print(f"[cache] Redis unavailable ({e}) — using in-process response cache")
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def _generation(self, name: str) -> int:
+        if self._redis is not None:
+            gen = self._redis.get(f"{self.prefix}:gen:{name}")
+            return int(gen) if gen else 0
+        return self._generations.get(name, 0)
+
+    def key(self, name: str, part: Any) -> str:
+        return f"{self.prefix}:{name}:{self._generation(name)}:{part}"
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[bytes]:
+        if self._redis is not None:
+            return self._redis.get(key)
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, body = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes, ttl: int):
+        if self._redis is not None:
+            self._redis.setex(key, ttl, body)
+            return
+        with self._lock:
+            self._local[key] = (time.monotonic() + ttl, body)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def invalidate(self, name: str, part: Any = None):
+        """Drop one cached key, or every key of an endpoint when part is None."""
+        if part is not None:
+            key = self.key(name, part)
+            if self._redis is not None:
+                self._redis.delete(key)
+            else:
+                with self._lock:
+                    self._local.pop(key, None)
+            return
+
+        if self._redis is not None:
+            self._redis.incr(f"{self.prefix}:gen:{name}")
+            return
+        with self._lock:
+            self._generations[name] = self._generations.get(name, 0) + 1
+            stale = f"{self.prefix}:{name}:"
+            for key in [k for k in self._local if k.startswith(stale)]:
+                del self._local[key]
+
+    # ------------------------------------------------------------------
+    # Decorator
+    # ------------------------------------------------------------------
+
+    def cached(self, ttl: int, key_fn: Callable[..., Any]):
+        """
+        Cache a view's 200 responses for ttl seconds.
+        key_fn receives the view's URL kwargs and returns the request key.
+        """
+        def decorator(view):
+            name = view.__name__
+
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = self.key(name, key_fn(**kwargs))
+                body = self.get(key)
+                if body is not None:
+                    return current_app.response_class(body, mimetype="application/json")
+
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code == 200:
+                    self.set(key, response.get_data(), ttl)
+                return response
+
+            return wrapper
+
+        return decorator
@@ -18,6 +18,20 @@ class PrivacySanitizer:
         'address': r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr)\b',
     }
 
+    # PII patterns compiled once, applied one after another in priority order
+    # (an earlier pattern's redaction must win over a later overlapping match)
+    _PII_REGEXES = tuple(
+        (re.compile(pattern, re.IGNORECASE), f'[REDACTED_{pii_type.upper()}]')
+        for pii_type, pattern in PII_PATTERNS.items()
+    )
+
+    SENSITIVE_KEYWORDS = (
+        'name', 'ssn', 'social_security', 'email', 'phone', 'address',
+        'exact_income', 'salary', 'account', 'password', 'dob',
+        'birth_date', 'credit_card', 'bank'
+    )
+    _SENSITIVE_REGEX = re.compile('|'.join(map(re.escape, SENSITIVE_KEYWORDS)))
+
     # Income brackets for bucketing
     INCOME_BRACKETS = [
         (0, 30000, "0-30k"),
@@ -57,13 +71,7 @@ class PrivacySanitizer:
 
     def _is_sensitive_field(self, field_name: str) -> bool:
         """Check if a field contains sensitive information."""
-        sensitive_keywords = [
-            'name', 'ssn', 'social_security', 'email', 'phone', 'address',
-            'exact_income', 'salary', 'account', 'password', 'dob',
-            'birth_date', 'credit_card', 'bank'
-        ]
-        field_lower = field_name.lower()
-        return any(keyword in field_lower for keyword in sensitive_keywords)
+        return self._SENSITIVE_REGEX.search(field_name.lower()) is not None
 
     def _anonymize_value(self, field_name: str, value: Any) -> Any:
         """Anonymize sensitive values (bucket income, remove exact identifiers)."""
@@ -87,8 +95,8 @@ class PrivacySanitizer:
     def remove_pii_from_text(self, text: str) -> str:
         """Remove PII patterns from free-form text."""
         sanitized = text
-        for pii_type, pattern in self.PII_PATTERNS.items():
-            sanitized = re.sub(pattern, f'[REDACTED_{pii_type.upper()}]', sanitized, flags=re.IGNORECASE)
+        for regex, replacement in self._PII_REGEXES:
+            sanitized = regex.sub(replacement, sanitized)
         return sanitized
 
     def get_sanitization_summary(self, raw_query: Dict[str, Any], public_query: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,106 @@
+"""
+Micro-batching for /api/search.
+
+Concurrent search requests are queued and drained by one background worker
+that waits up to MAX_WAIT_MS for more work, then runs the whole batch via
+WorkflowMatcher.search_many — one JINA embeddings call (plus one Elastic
+_msearch in Elastic mode) instead of one of each per request. If a batch
+fails, its queries are retried one by one so an error only reaches the
+caller whose query caused it.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Tuple
+
+MAX_BATCH = 32
+MAX_WAIT_MS = 5
+MAX_PENDING = 1024
+SEARCH_TIMEOUT = 30
+
+
+class BatchingSearchService:
+    """Coalesces concurrent matcher searches into batched round trips."""
+
+    def __init__(
+        self,
+        matcher,
+        max_batch: int = MAX_BATCH,
+        max_wait_ms: float = MAX_WAIT_MS,
+        max_pending: int = MAX_PENDING,
+    ):
+        self.matcher = matcher
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Tuple[Dict[str, Any], int, Future]]" = queue.Queue(max_pending)
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="search-batcher", daemon=True)
+        self._worker.start()
+
+    def search(self, query: Dict[str, Any], top_k: int = 10, timeout: float = SEARCH_TIMEOUT):
+        """Queue a search and block until its batch has run."""
+        future: Future = Future()
+        self._queue.put((query, top_k, future), timeout=timeout)
+        return future.result(timeout=timeout)
+
+    def close(self):
+        """Stop the worker after it flushes whatever is already queued."""
+        self._stopped.set()
+        self._worker.join(timeout=SEARCH_TIMEOUT)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not (self._stopped.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Tuple[Dict[str, Any], int, Future]]):
+        # search_many takes a single top_k, so group by it
+        groups: Dict[int, List[Tuple[Dict[str, Any], Future]]] = {}
+        for query, top_k, future in batch:
+            if future.set_running_or_notify_cancel():
+                groups.setdefault(top_k, []).append((query, future))
+
+        for top_k, items in groups.items():
+            try:
+                results = self.matcher.search_many([q for q, _ in items], top_k=top_k)
+            except Exception as e:
+                if len(items) == 1:
+                    items[0][1].set_exception(e)
+                    continue
+                # One bad query fails the whole batch: rerun each on its own
+                # so only its caller sees the error
+                for query, future in items:
+                    try:
+                        future.set_result(self.matcher.search_many([query], top_k=top_k)[0])
+                    except Exception as item_error:
+                        future.set_exception(item_error)
+                continue
+            for (_, future), result in zip(items, results):
+                future.set_result(result)
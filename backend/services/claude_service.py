@@ -6,6 +6,8 @@ Handles query decomposition, reasoning, and other LLM tasks.
 import anthropic
 from typing import List, Dict, Any, Optional
 
+from http_pool import get_anthropic_http_client
+
 
 class ClaudeService:
     """Service for Claude AI API calls."""
@@ -24,7 +26,7 @@ class ClaudeService:
             model: Claude model to use
             max_tokens: Max tokens for generation
         """
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = anthropic.Anthropic(api_key=api_key, http_client=get_anthropic_http_client())
         self.model = model
         self.max_tokens = max_tokens
 
@@ -8,6 +8,27 @@ from typing import List, Dict, Any, Optional
 from elasticsearch import Elasticsearch
 from elasticsearch.helpers import bulk
 
+from http_pool import ES_CONNECTIONS_PER_NODE
+
+
+# Embeddings are L2-normalized by EmbeddingService, so dot_product ranks the
+# same as cosine without the per-hit norm computation. int8_hnsw keeps a
+# quantized copy of each vector in the HNSW graph (~4x less RAM).
+VECTOR_SIMILARITY = "dot_product"
+VECTOR_INDEX_OPTIONS = {"type": "int8_hnsw"}
+
+# Fields left out of search hits. Workflow hits keep "embedding" because the
+# recomposer re-ranks them against subtask embeddings; nothing reads full_text
+# back, and node/children embeddings are never read after search.
+HIT_SOURCE_EXCLUDES = ["full_text"]
+NODE_SOURCE_EXCLUDES = ["embedding", "full_text"]
+
+# Reciprocal Rank Fusion parameters for hybrid_search
+RRF_RANK_WINDOW_SIZE = 100
+RRF_RANK_CONSTANT = 20
+RRF_KNN_K = 50
+RRF_KNN_NUM_CANDIDATES = 200
+
 
 class ElasticsearchService:
     """Service for Elasticsearch operations."""
@@ -46,7 +67,8 @@ class ElasticsearchService:
         if cloud_id and api_key:
             self.es = Elasticsearch(
                 cloud_id=cloud_id,
-                api_key=api_key
+                api_key=api_key,
+                connections_per_node=ES_CONNECTIONS_PER_NODE
             )
             connection_info = f"Elastic Cloud (ID: {cloud_id[:20]}...)"
         elif host:
@@ -54,10 +76,11 @@ class ElasticsearchService:
             if username and password:
                 self.es = Elasticsearch(
                     hosts=[host],
-                    basic_auth=(username, password)
+                    basic_auth=(username, password),
+                    connections_per_node=ES_CONNECTIONS_PER_NODE
                 )
             else:
-                self.es = Elasticsearch(hosts=[host])
+                self.es = Elasticsearch(hosts=[host], connections_per_node=ES_CONNECTIONS_PER_NODE)
             connection_info = host
         else:
             raise ValueError("Must provide either (cloud_id + api_key) or host")
@@ -72,6 +95,34 @@ class ElasticsearchService:
         except Exception as e:
             raise ConnectionError(f"Failed to connect to Elasticsearch at {connection_info}: {e}")
 
+    def _embedding_mapping(self) -> Dict[str, Any]:
+        """dense_vector mapping shared by the assets and nodes indices."""
+        return {
+            "type": "dense_vector",
+            "dims": self.embedding_dim,
+            "index": True,  # Enable indexing for kNN
+            "similarity": VECTOR_SIMILARITY,
+            "index_options": dict(VECTOR_INDEX_OPTIONS),
+        }
+
+    def _has_current_vector_mapping(self, index_name: str) -> bool:
+        """
+        Check whether an existing index uses the current embedding mapping.
+
+        Args:
+            index_name: Index to inspect
+
+        Returns:
+            True if the embedding field uses VECTOR_SIMILARITY
+        """
+        try:
+            mapping = self.es.indices.get_mapping(index=index_name)
+            props = mapping[index_name]["mappings"].get("properties", {})
+            return props.get("embedding", {}).get("similarity") == VECTOR_SIMILARITY
+        except Exception:
+            # Can't tell (e.g. restricted API key) — leave the index alone
+            return True
+
     def create_index(self, delete_existing: bool = False):
         """
         Create Elasticsearch index with proper mappings for workflows.
@@ -86,8 +137,13 @@ class ElasticsearchService:
 
         # Check if index already exists
         if self.es.indices.exists(index=self.index_name):
-            print(f"Index '{self.index_name}' already exists")
-            return
+            if self._has_current_vector_mapping(self.index_name):
+                print(f"Index '{self.index_name}' already exists")
+                return
+            # Old cosine/float mapping: rebuild. Callers re-index right after
+            # (load_and_index_workflows), which re-embeds every workflow.
+            self.es.indices.delete(index=self.index_name)
+            print(f"Deleted index with outdated vector mapping: {self.index_name}")
 
         # Define mappings
         mappings = {
@@ -137,12 +193,7 @@ class ElasticsearchService:
                     "depth": {"type": "integer"},  # Tree depth level
 
                     # Vector embedding for semantic search (serverless-compatible)
-                    "embedding": {
-                        "type": "dense_vector",
-                        "dims": self.embedding_dim,
-                        "index": True,  # Enable indexing for kNN
-                        "similarity": "cosine"
-                    },
+                    "embedding": self._embedding_mapping(),
 
                     # Full text representation
                     "full_text": {"type": "text"},
@@ -171,8 +222,11 @@ class ElasticsearchService:
 
         # Check if index already exists
         if self.es.indices.exists(index=self.nodes_index_name):
-            print(f"Nodes index '{self.nodes_index_name}' already exists")
-            return
+            if self._has_current_vector_mapping(self.nodes_index_name):
+                print(f"Nodes index '{self.nodes_index_name}' already exists")
+                return
+            self.es.indices.delete(index=self.nodes_index_name)
+            print(f"Deleted nodes index with outdated vector mapping: {self.nodes_index_name}")
 
         # Define mappings for nodes
         mappings = {
@@ -196,12 +250,7 @@ class ElasticsearchService:
                     "ordinal": {"type": "integer"},  # Order within parent
 
                     # Vector embedding for semantic search (serverless-compatible)
-                    "embedding": {
-                        "type": "dense_vector",
-                        "dims": self.embedding_dim,
-                        "index": True,  # Enable indexing for kNN
-                        "similarity": "cosine"
-                    }
+                    "embedding": self._embedding_mapping()
                 }
             }
             # Note: No settings needed - serverless handles sharding/replicas automatically
@@ -292,7 +341,8 @@ class ElasticsearchService:
         response = self.es.search(
             index=self.index_name,
             knn=knn_query,
-            size=top_k
+            size=top_k,
+            source_excludes=HIT_SOURCE_EXCLUDES
         )
 
         # Return standard ES hit structure with _source and _score
@@ -303,66 +353,77 @@ class ElasticsearchService:
         query_embedding: List[float],
         query_text: str,
         filters: Optional[Dict[str, Any]] = None,
-        top_k: int = 10,
-        vector_weight: float = 0.7
+        top_k: int = 10
     ) -> List[Dict[str, Any]]:
         """
         Perform hybrid search combining vector similarity and text search.
 
+        BM25 and kNN run as one request and are fused server-side with
+        Reciprocal Rank Fusion (Elastic ``rrf`` retriever).
+
         Args:
             query_embedding: Query embedding vector
             query_text: Query text for keyword search
             filters: Optional filters
             top_k: Number of results to return
-            vector_weight: Weight for vector search (0-1), text weight = 1 - vector_weight
 
         Returns:
             List of ES hits with standard structure: [{"_source": {...}, "_score": ...}, ...]
+            _score is the RRF score scaled to 0-1 (1 = ranked first by both retrievers)
         """
-        # Build query
+        filter_clauses = [
+            {"term": {field: value}}
+            for field, value in (filters or {}).items()
+            if value is not None
+        ]
+
+        text_query: Dict[str, Any] = {
+            "bool": {
+                "should": [
+                    {
+                        "multi_match": {
+                            "query": query_text,
+                            "fields": ["title^3", "description^2", "full_text", "tags^2"],
+                            "type": "best_fields"
+                        }
+                    }
+                ],
+                "filter": filter_clauses
+            }
+        }
+        knn: Dict[str, Any] = {
+            "field": "embedding",
+            "query_vector": query_embedding,
+            "k": max(top_k, RRF_KNN_K),
+            "num_candidates": max(top_k * 10, RRF_KNN_NUM_CANDIDATES)
+        }
+        if filter_clauses:
+            knn["filter"] = filter_clauses
+
         query = {
             "size": top_k,
-            "query": {
-                "bool": {
-                    "should": [
-                        # Vector similarity (weighted)
-                        {
-                            "script_score": {
-                                "query": {"match_all": {}},
-                                "script": {
-                                    "source": f"{vector_weight} * (cosineSimilarity(params.query_vector, 'embedding') + 1.0)",
-                                    "params": {"query_vector": query_embedding}
-                                }
-                            }
-                        },
-                        # Text search (weighted)
-                        {
-                            "multi_match": {
-                                "query": query_text,
-                                "fields": ["title^3", "description^2", "full_text", "tags^2"],
-                                "type": "best_fields",
-                                "boost": 1 - vector_weight
-                            }
-                        }
+            "retriever": {
+                "rrf": {
+                    "retrievers": [
+                        {"standard": {"query": text_query}},
+                        {"knn": knn}
                     ],
-                    "filter": []
+                    "rank_window_size": max(top_k, RRF_RANK_WINDOW_SIZE),
+                    "rank_constant": RRF_RANK_CONSTANT
                 }
-            }
+            },
+            "_source": {"excludes": HIT_SOURCE_EXCLUDES}
         }
 
-        # Add filters
-        if filters:
-            for field, value in filters.items():
-                if value is not None:
-                    query["query"]["bool"]["filter"].append(
-                        {"term": {field: value}}
-                    )
-
         # Execute search
         response = self.es.search(index=self.index_name, body=query)
 
-        # Return standard ES hit structure with _source and _score
-        return response["hits"]["hits"]
+        # Best possible RRF score: rank 1 in both retrievers
+        max_score = 2.0 / (RRF_RANK_CONSTANT + 1)
+        hits = response["hits"]["hits"]
+        for hit in hits:
+            hit["_score"] = min(1.0, (hit["_score"] or 0.0) / max_score)
+        return hits
 
     def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -408,7 +469,8 @@ class ElasticsearchService:
             index=self.index_name,
             query=query,
             size=1000,
-            sort=[{sort_by: "asc"}]
+            sort=[{sort_by: "asc"}],
+            source_excludes=NODE_SOURCE_EXCLUDES
         )
 
         return [hit["_source"] for hit in response["hits"]["hits"]]
@@ -481,12 +543,52 @@ class ElasticsearchService:
                 "k": top_k,
                 "num_candidates": max(top_k * 10, 50),
                 "filter": must_clauses
-            }
+            },
+            "_source": {"excludes": NODE_SOURCE_EXCLUDES}
         }
 
         response = self.es.search(index=self.nodes_index_name, body=query)
         return response["hits"]["hits"]
 
+    def force_merge(self):
+        """
+        Merge each index down to one segment (a single HNSW graph to search).
+
+        Expensive on a live index, so meant for one-off setup after a bulk
+        load, not for every startup. Best-effort: serverless projects reject
+        forcemerge, and failures are ignored.
+        """
+        for index in (self.index_name, self.nodes_index_name):
+            try:
+                self.es.indices.refresh(index=index)
+                self.es.indices.forcemerge(index=index, max_num_segments=1)
+            except Exception:
+                pass
+
+    def warmup(self):
+        """
+        Run a throwaway kNN query per index so the HNSW graph pages are in the
+        filesystem cache before the first real request. Best-effort.
+        """
+        probe = [0.0] * self.embedding_dim
+        probe[0] = 1.0  # dot_product needs a unit-length query vector
+
+        for index in (self.index_name, self.nodes_index_name):
+            try:
+                if not self.es.indices.exists(index=index):
+                    continue
+            except Exception:
+                continue
+            try:
+                self.es.search(
+                    index=index,
+                    knn={"field": "embedding", "query_vector": probe, "k": 10, "num_candidates": 100},
+                    size=0,
+                )
+                print(f"Warmed index: {index}")
+            except Exception as e:
+                print(f"Warmup skipped for {index}: {e}")
+
     def delete_index(self):
         """Delete the assets index."""
         if self.es.indices.exists(index=self.index_name):
@@ -0,0 +1,98 @@
+"""
+Cache for Jina text embeddings.
+
+Keyed by model, task and a hash of the text, so repeated queries and
+subtasks skip the embedding API call. Process-local LRU, plus a shared
+Redis tier when a Redis URL is given; vectors are stored in Redis as packed
+little-endian float32 bytes.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+EMBEDDING_CACHE_SIZE = 4096  # vectors kept in-process
+EMBEDDING_CACHE_TTL = 86400  # seconds, Redis tier only
+
+
+class EmbeddingCache:
+    """LRU of embedding vectors with an optional Redis tier."""
+
+    def __init__(
+        self,
+        maxsize: int = EMBEDDING_CACHE_SIZE,
+        redis_url: Optional[str] = None,
+        ttl: int = EMBEDDING_CACHE_TTL,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._redis = None
+        # Least recently used first
+        self._local: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if redis_url:
+            try:
+                import redis
+
+                self._redis = redis.Redis.from_url(redis_url)
+                self._redis.ping()
+                print(f"[embedding-cache] Redis tier at {redis_url}")
+            except Exception as e:
+                self._redis = None
+                print(f"[embedding-cache] Redis unavailable ({e}) — in-process only")
+
+    @staticmethod
+    def key(model: str, task: str, text: str) -> str:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        return f"emb:{model}:{task}:{digest}"
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors for keys, None where missing."""
+        vectors: List[Optional[List[float]]] = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._local.get(key)
+                if vector is None:
+                    missing.append(i)
+                else:
+                    self._local.move_to_end(key)
+                    vectors[i] = vector.tolist()
+
+        if missing and self._redis is not None:
+            try:
+                packed = self._redis.mget([keys[i] for i in missing])
+            except Exception:
+                packed = [None] * len(missing)
+            found = []
+            for i, raw in zip(missing, packed):
+                if raw is not None:
+                    vector = np.frombuffer(raw, dtype="<f4")
+                    vectors[i] = vector.tolist()
+                    found.append((keys[i], vector))
+            self._remember(found)
+        return vectors
+
+    def put_many(self, keys: Sequence[str], vectors: Sequence[Sequence[float]]):
+        entries = [(key, np.asarray(vector, dtype="<f4")) for key, vector in zip(keys, vectors)]
+        self._remember(entries)
+        if self._redis is not None and entries:
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for key, vector in entries:
+                    pipe.set(key, vector.tobytes(), ex=self.ttl)
+                pipe.execute()
+            except Exception as e:
+                print(f"[embedding-cache] Redis write failed ({e})")
+
+    def _remember(self, entries):
+        with self._lock:
+            for key, vector in entries:
+                self._local[key] = vector
+                self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
@@ -4,8 +4,12 @@ Handles text-to-vector conversion for semantic search.
 """
 
 import requests
-from typing import List, Union
+from typing import List, Optional, Union
 import numpy as np
+import orjson
+
+from http_pool import get_session
+from services.embedding_cache import EmbeddingCache
 
 
 class EmbeddingService:
@@ -15,7 +19,9 @@ class EmbeddingService:
         self,
         api_key: str,
         model: str = "jina-embeddings-v3",
-        embedding_dim: int = 1024
+        embedding_dim: int = 1024,
+        session: Optional[requests.Session] = None,
+        cache: Optional[EmbeddingCache] = None
     ):
         """
         Initialize Jina embedding service.
@@ -24,11 +30,15 @@ class EmbeddingService:
             api_key: Jina AI API key
             model: Jina model name
             embedding_dim: Dimension of embedding vectors
+            session: HTTP session to reuse (defaults to the shared keep-alive pool)
+            cache: Embedding cache checked before calling the API (None disables it)
         """
         self.api_key = api_key
         self.model = model
         self.embedding_dim = embedding_dim
         self.api_url = "https://api.jina.ai/v1/embeddings"
+        self.session = session or get_session()
+        self.cache = cache
 
         print(f"Initialized EmbeddingService with model: {model}")
 
@@ -55,6 +65,25 @@ class EmbeddingService:
         is_single = isinstance(text, str)
         texts = [text] if is_single else text
 
+        if self.cache is None:
+            embeddings = self._request(texts, task)
+        else:
+            # Only texts not cached for this model/task go to the API, once each
+            model_key = f"{self.model}:{self.embedding_dim}"
+            keys = [EmbeddingCache.key(model_key, task, t) for t in texts]
+            embeddings = self.cache.get_many(keys)
+            misses = list(dict.fromkeys(t for t, e in zip(texts, embeddings) if e is None))
+            if misses:
+                fresh = dict(zip(misses, self._request(misses, task)))
+                self.cache.put_many([EmbeddingCache.key(model_key, task, t) for t in misses],
+                                    [fresh[t] for t in misses])
+                embeddings = [e if e is not None else fresh[t] for t, e in zip(texts, embeddings)]
+
+        # Return single vector or list of vectors based on input
+        return embeddings[0] if is_single else embeddings
+
+    def _request(self, texts: List[str], task: str) -> List[List[float]]:
+        """Embed texts with one Jina API call; vectors are L2-normalized."""
         # Make API request
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -70,14 +99,16 @@ class EmbeddingService:
         }
 
         try:
-            response = requests.post(self.api_url, json=payload, headers=headers, timeout=30)
+            response = self.session.post(self.api_url, data=orjson.dumps(payload), headers=headers, timeout=30)
             response.raise_for_status()
 
-            result = response.json()
-            embeddings = [item["embedding"] for item in result["data"]]
+            result = orjson.loads(response.content)
+            vectors = np.array([item["embedding"] for item in result["data"]], dtype=np.float32)
 
-            # Return single vector or list of vectors based on input
-            return embeddings[0] if is_single else embeddings
+            # L2-normalize so the index can use dot_product similarity
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            return (vectors / norms).tolist()
 
         except requests.exceptions.RequestException as e:
             print(f"Error generating embeddings: {e}")
@@ -134,6 +165,24 @@ class EmbeddingService:
 
         return float(dot_product / (norm1 * norm2))
 
+    def cosine_similarities(self, vec: List[float], matrix: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of one vector against every row of a matrix.
+
+        Args:
+            vec: Query embedding vector
+            matrix: (n, dim) array of embedding vectors
+
+        Returns:
+            Array of n cosine similarity scores
+        """
+        vec_np = np.asarray(vec, dtype=np.float32)
+        matrix = np.asarray(matrix, dtype=np.float32)
+
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vec_np)
+        sims = matrix @ vec_np
+        return np.divide(sims, norms, out=np.zeros_like(sims), where=norms != 0)
+
 
 # Example usage
 if __name__ == "__main__":
@@ -64,6 +64,7 @@ def main():
     # Ingest workflows with JINA embeddings
     print("\n[3/3] Embedding workflows with JINA and indexing into Elasticsearch …")
     elastic.ingest_workflows(workflows)
+    elastic.force_merge()
 
     # Verify
     count = elastic.count()
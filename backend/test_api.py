@@ -51,6 +51,12 @@ pp("BALANCE", r.get_json())
 r = client.post("/api/sanitize", json={"raw_query": {"task_type": "tax_filing", "name": "John Smith", "ssn": "123-45-6789", "exact_income": 87432.18}})
 pp("SANITIZE", r.get_json())
 
+# PII text redaction: email takes priority over an overlapping address match
+from sanitizer import PrivacySanitizer
+redacted = PrivacySanitizer().remove_pii_from_text("10 Downing St@mail.com")
+pp("PII TEXT", redacted)
+assert redacted == "10 Downing [REDACTED_EMAIL]", redacted
+
 # Cart add
 r = client.post("/api/commerce/cart/add", json={"user_id": "default_user", "workflow_id": "smart_grocery_optimizer"})
 pp("CART ADD", r.get_json())
@@ -0,0 +1,108 @@
+"""Checks for the write-behind update batcher and the search micro-batcher."""
+import sys
+import threading
+sys.path.insert(0, ".")
+
+from search_batcher import BatchingSearchService
+from update_batcher import BatchingUpdateService
+
+
+def pp(label, data):
+    print(f"\n{'='*50}")
+    print(f"  {label}")
+    print(f"{'='*50}")
+    print(data)
+
+
+class FakeElastic:
+    """Records update_fields calls instead of sending _bulk requests."""
+
+    def __init__(self):
+        self.calls = []
+
+    def update_fields(self, docs):
+        self.calls.append(docs)
+        return []
+
+
+# Several updates to one document coalesce into a single update_fields call
+elastic = FakeElastic()
+batcher = BatchingUpdateService(elastic, flush_interval=60)
+batcher.update_field("wf_1", "rating", 4.5)
+batcher.update_field("wf_1", "rating", 4.6)
+batcher.update_field("wf_1", "usage_count", 7)
+batcher.update_field("wf_2", "rating", 3.0)
+assert batcher.pending("wf_1") == {"rating": 4.6, "usage_count": 7}
+batcher.flush()
+pp("UPDATE COALESCING", elastic.calls)
+assert elastic.calls == [{"wf_1": {"rating": 4.6, "usage_count": 7}, "wf_2": {"rating": 3.0}}]
+assert batcher.pending("wf_1") == {}
+batcher.close()
+
+# Pending updates are written on shutdown
+elastic = FakeElastic()
+flushed = []
+batcher = BatchingUpdateService(elastic, on_flush=lambda: flushed.append(True), flush_interval=60)
+batcher.update_field("wf_3", "rating", 2.2)
+assert elastic.calls == []
+batcher.close()
+pp("UPDATE FLUSH ON CLOSE", elastic.calls)
+assert elastic.calls == [{"wf_3": {"rating": 2.2}}]
+assert flushed == [True]
+
+
+
+class FakeMatcher:
+    """search_many like Elastic's _msearch: any bad query fails the whole call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def search_many(self, queries, top_k=10):
+        self.calls.append([q["task_type"] for q in queries])
+        if any(q["task_type"] == "bad" for q in queries):
+            raise RuntimeError("msearch item failed")
+        return [[{"workflow_id": q["task_type"], "top_k": top_k}] for q in queries]
+
+
+def search_concurrently(searcher, task_types):
+    """Submit one search per task type at once; returns {task_type: result or error}."""
+    results = {}
+    start = threading.Barrier(len(task_types))
+
+    def run(task_type):
+        start.wait()
+        try:
+            results[task_type] = searcher.search({"task_type": task_type}, top_k=3)
+        except Exception as e:
+            results[task_type] = e
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in task_types]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+# Concurrent searches go out as one search_many call; each caller gets its own result
+matcher = FakeMatcher()
+with BatchingSearchService(matcher, max_wait_ms=200) as searcher:
+    results = search_concurrently(searcher, ["tax", "shopping", "travel"])
+pp("SEARCH BATCHING", {"calls": matcher.calls, "results": results})
+assert len(matcher.calls) == 1 and sorted(matcher.calls[0]) == ["shopping", "tax", "travel"]
+for task_type in ("tax", "shopping", "travel"):
+    assert results[task_type] == [{"workflow_id": task_type, "top_k": 3}]
+
+# A failing query only fails its own caller
+matcher = FakeMatcher()
+with BatchingSearchService(matcher, max_wait_ms=200) as searcher:
+    results = search_concurrently(searcher, ["tax", "bad", "travel"])
+pp("SEARCH ERROR ISOLATION", {"calls": matcher.calls, "results": results})
+assert isinstance(results["bad"], RuntimeError)
+assert results["tax"] == [{"workflow_id": "tax", "top_k": 3}]
+assert results["travel"] == [{"workflow_id": "travel", "top_k": 3}]
+
+print("\n" + "=" * 50)
+print("  ALL TESTS PASSED")
+print("=" * 50)
@@ -0,0 +1,105 @@
+"""Commerce engine checks: SQLite journal persistence and concurrent purchases."""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+sys.path.insert(0, ".")
+
+from commerce import CommerceEngine
+
+
+def pp(label, data):
+    print(f"\n{'='*50}")
+    print(f"  {label}")
+    print(f"{'='*50}")
+    print(data)
+
+
+tmpdir = tempfile.mkdtemp()
+
+# Write-behind journal: every mutation survives a flush + reload
+db = os.path.join(tmpdir, "reload.db")
+engine = CommerceEngine(journal_path=db)
+engine.deposit("buyer", 1000)
+engine.purchase_workflow("buyer", {"workflow_id": "wf_a", "title": "A", "token_cost": 100, "creator_id": "alice"})
+engine.add_to_cart("buyer", {"workflow_id": "wf_b", "title": "B", "token_cost": 40, "creator_id": "bob"})
+engine.add_to_cart("buyer", {"workflow_id": "wf_c", "title": "C", "token_cost": 60, "creator_id": "alice"})
+engine.checkout_cart("buyer")
+engine.journal.flush()
+
+reloaded = CommerceEngine(journal_path=db)
+pp("JOURNAL RELOAD", {
+    "balances": reloaded.user_balances,
+    "creator_earnings": reloaded.creator_earnings,
+    "transactions": len(reloaded.transactions),
+})
+assert reloaded.user_balances == engine.user_balances
+assert reloaded.user_balances["buyer"] == 800
+# Cart items don't carry a creator, so checkout pays the marketplace
+assert reloaded.creator_earnings == engine.creator_earnings == {"alice": 85, "marketplace": 34 + 51}
+assert [tx.to_dict() for tx in reloaded.transactions] == [tx.to_dict() for tx in engine.transactions]
+assert len(reloaded.get_transactions("buyer")) == 4  # deposit + 3 purchases
+reloaded.close()
+engine.close()
+
+# Concurrent buyers paying the same creator: journal totals match memory
+db = os.path.join(tmpdir, "concurrent.db")
+engine = CommerceEngine(journal_path=db)
+workflow = {"workflow_id": "wf", "title": "WF", "token_cost": 100, "creator_id": "alice"}
+buyers = [f"buyer_{i}" for i in range(16)]
+for buyer in buyers:
+    engine.deposit(buyer, 10_000)
+
+# Widen the window between computing creator totals and journaling them
+_record = engine.journal.record
+
+
+def slow_record(*args, **kwargs):
+    time.sleep(random.random() / 1000)
+    _record(*args, **kwargs)
+
+
+engine.journal.record = slow_record
+
+
+mismatches = []
+
+
+def check_journal():
+    """Between rounds: the flushed journal holds the in-memory totals."""
+    engine.journal.flush()
+    journaled = dict(engine.journal.conn.execute("SELECT creator_id, earned FROM creator_earnings"))
+    if journaled.get("alice", 0) != engine.creator_earnings.get("alice", 0):
+        mismatches.append((journaled.get("alice"), engine.creator_earnings.get("alice")))
+
+
+start = threading.Barrier(len(buyers), action=check_journal)
+
+
+def buy(buyer):
+    for _ in range(20):
+        start.wait()  # every round's purchases race each other
+        engine.purchase_workflow(buyer, workflow)
+
+
+threads = [threading.Thread(target=buy, args=(buyer,)) for buyer in buyers]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+engine.close()
+
+reloaded = CommerceEngine(journal_path=db)
+pp("CONCURRENT EARNINGS", {
+    "memory": engine.creator_earnings, "journal": reloaded.creator_earnings, "mismatches": mismatches,
+})
+assert not mismatches, mismatches
+assert reloaded.creator_earnings == engine.creator_earnings == {"alice": 16 * 20 * 85}
+assert reloaded.user_balances == engine.user_balances
+reloaded.close()
+
+print("\n" + "=" * 50)
+print("  ALL TESTS PASSED")
+print("=" * 50)
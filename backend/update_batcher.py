@@ -0,0 +1,105 @@
+"""
+Write-behind batching for Elastic partial updates (e.g. /api/feedback ratings).
+
+Updates are coalesced per workflow (the latest value of a field wins) and
+flushed by one background thread every FLUSH_INTERVAL seconds, or as soon as
+MAX_BATCH workflows are pending, as a single _bulk request instead of one
+_update round trip per vote. Until a batch is written, pending() exposes the
+queued values so read-modify-write callers build on them rather than on the
+stale indexed document; a batch that fails to write is queued again.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+MAX_BATCH = 200
+FLUSH_INTERVAL = 0.1  # seconds
+
+
+class BatchingUpdateService:
+    """Buffers per-document field updates and writes them with _bulk."""
+
+    def __init__(
+        self,
+        elastic_client,
+        on_flush: Optional[Callable[[], None]] = None,
+        max_batch: int = MAX_BATCH,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.elastic_client = elastic_client
+        self.on_flush = on_flush
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # Taken by flush() but not yet confirmed written
+        self._inflight: Dict[str, Dict[str, Any]] = {}
+        self._flush_lock = threading.Lock()  # one _bulk in flight at a time
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="update-batcher", daemon=True)
+        self._worker.start()
+
+    def update_field(self, workflow_id: str, field: str, value: Any):
+        """Queue a partial update; returns without waiting for Elastic."""
+        with self._lock:
+            self._pending.setdefault(workflow_id, {})[field] = value
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def pending(self, workflow_id: str) -> Dict[str, Any]:
+        """Queued field values for a workflow not yet visible in Elastic."""
+        with self._lock:
+            fields = dict(self._inflight.get(workflow_id, {}))
+            fields.update(self._pending.get(workflow_id, {}))
+        return fields
+
+    def flush(self):
+        """Write everything pending in one _bulk request."""
+        with self._flush_lock:
+            with self._lock:
+                docs, self._pending = self._pending, {}
+                self._inflight = docs
+            if not docs:
+                return
+            try:
+                retry = self.elastic_client.update_fields(docs)
+            except Exception:
+                self._requeue(docs)
+                raise
+            finally:
+                with self._lock:
+                    self._inflight = {}
+            if retry:
+                self._requeue({workflow_id: docs[workflow_id] for workflow_id in retry})
+            if self.on_flush:
+                self.on_flush()
+
+    def _requeue(self, docs: Dict[str, Dict[str, Any]]):
+        """Put unwritten docs back; values queued since the flush win."""
+        with self._lock:
+            for workflow_id, fields in docs.items():
+                newer = self._pending.get(workflow_id, {})
+                self._pending[workflow_id] = {**fields, **newer}
+
+    def close(self):
+        """Stop the worker and write any remaining updates."""
+        self._stopped.set()
+        self._wake.set()
+        self._worker.join(timeout=5)
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[elastic] batched update failed, will retry: {e}")
@@ -15,6 +15,7 @@ import time
 import hmac
 import hashlib
 import base64
+import orjson
 import requests
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -31,9 +32,18 @@ VISA_MERCHANT_ID = os.getenv("VISA_MERCHANT_ID")
 CYBERSOURCE_URL = os.getenv("CYBERSOURCE_URL", "https://apitest.cybersource.com")  # test environment
 VISA_DIRECT_URL = os.getenv("VISA_DIRECT_URL", "https://sandbox.api.visa.com/visadirect")
 
+# Where CyberSource sends the shopper back after checkout
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
+
 visa_bp = Blueprint('visa_payments', __name__)
 
 
+def _json_body() -> Dict[str, Any]:
+    """Parse the JSON request body with orjson, skipping Werkzeug's body caching."""
+    raw = request.get_data(cache=False)
+    return orjson.loads(raw) if raw else {}
+
+
 class VisaPaymentService:
     """
     Visa Developer API service for payment processing and payouts.
@@ -132,8 +142,8 @@ class VisaPaymentService:
             "unsigned_field_names": "",
 
             # Return URLs
-            "override_custom_receipt_page": f"{os.getenv('FRONTEND_URL', 'http://localhost:3000')}/payment/success",
-            "override_custom_cancel_page": f"{os.getenv('FRONTEND_URL', 'http://localhost:3000')}/payment/cancel",
+            "override_custom_receipt_page": f"{FRONTEND_URL}/payment/success",
+            "override_custom_cancel_page": f"{FRONTEND_URL}/payment/cancel",
         }
 
         # Generate signature
@@ -370,7 +380,7 @@ def create_visa_payment():
     }
     """
     try:
-        data = request.json
+        data = _json_body()
         user_id = data.get('user_id', 'default_user')
         token_package = data.get('token_package', 'starter')
 
@@ -457,7 +467,7 @@ def payout_creator():
     }
     """
     try:
-        data = request.json
+        data = _json_body()
         creator_id = data.get('creator_id')
         card_number = data.get('card_number')
         amount_tokens = data.get('amount_tokens')
@@ -5,7 +5,7 @@ Loads workflows from JSON files and prepares them for indexing.
 Does NOT create artificial tree structures - uses the unified Workflow model directly.
 """
 
-import json
+import orjson
 from typing import List, Dict, Any, Tuple
 
 from models import Workflow, WorkflowNodeDoc
@@ -24,8 +24,8 @@ def load_workflows_from_json(workflows_path: str) -> List[Workflow]:
     Returns:
         List of Workflow objects
     """
-    with open(workflows_path, 'r') as f:
-        data = json.load(f)
+    with open(workflows_path, 'rb') as f:
+        data = orjson.loads(f.read())
         workflows_data = data.get("workflows", [])
 
     workflows = []
@@ -0,0 +1,24 @@
+"""
+WSGI entrypoint for production.
+
+Patches the standard library for gevent *before* the app (and requests /
+elasticsearch / anthropic) is imported, so outbound HTTP calls yield to
+other requests instead of blocking the worker.
+
+Run:
+  gunicorn wsgi:app -k gevent --worker-connections 1000 --bind 0.0.0.0:$PORT
+
+Leave AGENT_WORKERS=0 under gevent workers — the agent process pool is
+meant for the threaded dev server / sync workers.
+"""
+
+try:
+    from gevent import monkey
+
+    monkey.patch_all()
+except ImportError:
+    pass
+
+from api import app  # noqa: E402
+
+__all__ = ["app"]